@@ -0,0 +1,49 @@
+# auth-service/app/core/security.py
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+# bcrypt cost factor (log2 of the number of rounds). Each +1 doubles hashing time.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt ignores (and bcrypt>=5 rejects) password bytes beyond this.
+BCRYPT_MAX_PASSWORD_BYTES = 72
+# Upper bound on concurrent hash/verify operations. bcrypt releases the GIL, so this
+# is effectively the number of cores spent on password work at any time.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt is deliberately slow (tens to hundreds of milliseconds), so it never runs on
+# the event loop. A dedicated pool keeps a login burst from starving the default executor.
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+# Verified against when a user does not exist, so unknown usernames cost the same
+# time as wrong passwords and cannot be enumerated by timing.
+_DUMMY_HASH = pwd_context.hash("dummy-password-for-timing")
+
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.verify, password, hashed_password)
+
+
+async def verify_dummy_password(password: str) -> bool:
+    """Spends the same time as a real verification; always returns False."""
+    await verify_password(password, _DUMMY_HASH)
+    return False
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True when a stored hash was made with a different cost than BCRYPT_ROUNDS."""
+    return pwd_context.needs_update(hashed_password)
+
+
+def shutdown_executor():
+    _hash_executor.shutdown(wait=False)
@@ -2,6 +2,7 @@ from fastapi import FastAPI, HTTPException, status
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
+from .core import security
 from .routers import auth
 from .database import config as database_config
 
@@ -24,6 +25,7 @@ async def startup_event():
 async def shutdown_event():
     print("Auth Service: Shutting down.")
     await database_config.close_db()
+    security.shutdown_executor()
 
 @app.get("/health", status_code=status.HTTP_200_OK)
 async def health_check():
@@ -1,6 +1,15 @@
 # auth-service/app/routers/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from typing import Any, Dict
+
+from common.auth import TokenIssuer, get_current_claims, get_token_issuer
+
+from ..core import security
+from ..database import config as database_config
+from ..models.user import User
 
 router = APIRouter()
 
@@ -11,27 +20,95 @@ class UserLogin(BaseModel):
 class UserRegister(BaseModel):
     username: str
     email: str
-    password: str
+    password: str = Field(min_length=1, max_length=security.BCRYPT_MAX_PASSWORD_BYTES)
+
+    @field_validator("password")
+    @classmethod
+    def check_password_bytes(cls, password: str) -> str:
+        # bcrypt only uses the first 72 bytes; longer (e.g. multi-byte) passwords are rejected
+        # up front rather than silently truncated or failing inside the hasher.
+        if len(password.encode("utf-8")) > security.BCRYPT_MAX_PASSWORD_BYTES:
+            raise ValueError(f"Password must be at most {security.BCRYPT_MAX_PASSWORD_BYTES} bytes")
+        return password
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
 async def register_user(user: UserRegister):
-    # Dummy logic for registration
-    # In a real app: hash password, save to DB
-    return {"message": f"User {user.username} registered successfully (dummy)"}
+    """
+    Creates a new user. The password is hashed off the event loop before the insert.
+    """
+    hashed_password = await security.hash_password(user.password)
+    async with database_config.get_session() as session:
+        existing = await session.execute(
+            select(User.id).where(or_(User.username == user.username, User.email == user.email))
+        )
+        if existing.first() is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Username or email is already registered",
+            )
+        new_user = User(username=user.username, email=user.email, hashed_password=hashed_password)
+        session.add(new_user)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent registration of the same username/email.
+            await session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Username or email is already registered",
+            )
+    return {"id": new_user.id, "message": f"User {user.username} registered successfully"}
 
 @router.post("/token", status_code=status.HTTP_200_OK)
-async def login_for_access_token(form_data: UserLogin): # Typically uses OAuth2PasswordRequestForm
-    # Dummy logic for login
-    # In a real app: verify password, generate JWT
-    if form_data.username == "test" and form_data.password == "password":
-        return {"access_token": "dummy_jwt_token", "token_type": "bearer"}
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Incorrect username or password",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+async def login_for_access_token(
+    form_data: UserLogin, # Typically uses OAuth2PasswordRequestForm
+    issuer: TokenIssuer = Depends(get_token_issuer),
+):
+    """
+    Verifies the user's password and issues a signed JWT that every service can
+    verify locally with common.auth.
+    """
+    async with database_config.get_session() as session:
+        result = await session.execute(
+            select(User.id, User.hashed_password, User.is_active).where(User.username == form_data.username)
+        )
+        row = result.first()
+
+    if row is None:
+        await security.verify_dummy_password(form_data.password)
+        is_valid = False
+    else:
+        is_valid = await security.verify_password(form_data.password, row.hashed_password)
+
+    if not is_valid or row.is_active is False:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Transparently upgrade hashes made with an older BCRYPT_ROUNDS setting.
+    if security.needs_rehash(row.hashed_password):
+        new_hash = await security.hash_password(form_data.password)
+        async with database_config.get_session() as session:
+            user = await session.get(User, row.id)
+            if user is not None:
+                user.hashed_password = new_hash
+                await session.commit()
+
+    return {
+        "access_token": issuer.issue(form_data.username, {"uid": row.id}),
+        "token_type": "bearer",
+    }
 
 @router.get("/me", status_code=status.HTTP_200_OK)
-async def read_users_me():
-    # Dummy endpoint to get current user info (requires authentication)
-    return {"username": "current_user", "email": "user@example.com"}
\ No newline at end of file
+async def read_users_me(claims: Dict[str, Any] = Depends(get_current_claims)):
+    """Returns the profile of the user identified by the caller's verified access token."""
+    async with database_config.get_session() as session:
+        result = await session.execute(
+            select(User.username, User.email).where(User.username == claims["sub"])
+        )
+        row = result.first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return {"username": row.username, "email": row.email}
@@ -0,0 +1,3 @@
+# common/__init__.py
+# Code shared between the microservices. Each service mounts this directory at
+# /app/common so it can be imported as the top-level `common` package.
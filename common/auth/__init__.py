@@ -0,0 +1,26 @@
+# common/auth/__init__.py
+from .tokens import (
+    InvalidTokenError,
+    KeyRing,
+    TokenIssuer,
+    TokenVerifier,
+    VerifiedTokenCache,
+)
+from .dependencies import (
+    JWTAuthMiddleware,
+    get_current_claims,
+    get_token_issuer,
+    get_token_verifier,
+)
+
+__all__ = [
+    "InvalidTokenError",
+    "KeyRing",
+    "TokenIssuer",
+    "TokenVerifier",
+    "VerifiedTokenCache",
+    "JWTAuthMiddleware",
+    "get_current_claims",
+    "get_token_issuer",
+    "get_token_verifier",
+]
@@ -0,0 +1,121 @@
+# common/auth/dependencies.py
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import parse_qs
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from .tokens import InvalidTokenError, KeyRing, TokenIssuer, TokenVerifier, VerifiedTokenCache
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+@lru_cache(maxsize=None)
+def get_token_verifier() -> TokenVerifier:
+    """Process-wide verifier configured from the environment."""
+    cache = VerifiedTokenCache(maxsize=int(os.getenv("JWT_CACHE_SIZE", "4096")))
+    return TokenVerifier(KeyRing.from_env(), cache=cache, issuer=os.getenv("JWT_ISSUER") or None)
+
+
+@lru_cache(maxsize=None)
+def get_token_issuer() -> TokenIssuer:
+    """Process-wide issuer configured from the environment (used by auth-service only)."""
+    return TokenIssuer(
+        KeyRing.from_env(),
+        expire_minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")),
+        issuer=os.getenv("JWT_ISSUER") or None,
+    )
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def get_current_claims(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Dict[str, Any]:
+    """
+    FastAPI dependency returning the verified claims of the request's bearer token.
+    Reuses the claims already verified by JWTAuthMiddleware when it is installed.
+    """
+    claims = getattr(request.state, "token_claims", None)
+    if claims is not None:
+        return claims
+    if credentials is None:
+        raise _unauthorized("Not authenticated")
+    try:
+        claims = get_token_verifier().verify(credentials.credentials)
+    except InvalidTokenError as e:
+        raise _unauthorized(f"Invalid token: {e}")
+    request.state.token_claims = claims
+    return claims
+
+
+class JWTAuthMiddleware:
+    """
+    ASGI middleware that rejects HTTP and WebSocket requests without a valid bearer token.
+    Browsers cannot set headers on WebSocket handshakes, so WebSockets may pass the token
+    as an `access_token` query parameter instead. Verified claims are stored on
+    `request.state.token_claims`.
+    """
+
+    def __init__(self, app, verifier: Optional[TokenVerifier] = None, exempt_paths: Iterable[str] = ()):
+        self.app = app
+        self.verifier = verifier
+        self.exempt_paths = tuple(exempt_paths)
+
+    def _is_exempt(self, path: str) -> bool:
+        for exempt in self.exempt_paths:
+            if path == exempt or (exempt != "/" and path.startswith(exempt.rstrip("/") + "/")):
+                return True
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or self._is_exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        token = None
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, credentials = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and credentials:
+                    token = credentials.strip()
+                break
+        if token is None and scope["type"] == "websocket":
+            token = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("access_token", [None])[0]
+
+        error = "Not authenticated"
+        if token is not None:
+            verifier = self.verifier or get_token_verifier()
+            try:
+                claims = verifier.verify(token)
+            except InvalidTokenError as e:
+                error = f"Invalid token: {e}"
+            else:
+                scope.setdefault("state", {})["token_claims"] = claims
+                await self.app(scope, receive, send)
+                return
+
+        if scope["type"] == "websocket":
+            await send({"type": "websocket.close", "code": 1008})
+            return
+        body = json.dumps({"detail": error}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_401_UNAUTHORIZED,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"www-authenticate", b"Bearer"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,181 @@
+# common/auth/tokens.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from jose import jwt, JWTError
+
+DEFAULT_KEY_ID = "default"
+
+
+class InvalidTokenError(Exception):
+    """Raised when a token is malformed, expired, or signed with an unknown key."""
+
+
+class KeyRing:
+    """
+    Holds every signing key a service accepts, indexed by key id (`kid`).
+
+    Tokens are always signed with the active key, but verification accepts any key in
+    the ring, so a new key can be rolled out and made active before the old one is retired.
+    """
+
+    def __init__(self, keys: Dict[str, str], active_key_id: str, algorithm: str = "HS256"):
+        if not keys:
+            raise ValueError("KeyRing requires at least one signing key.")
+        if active_key_id not in keys:
+            raise ValueError(f"Active key id '{active_key_id}' is not in the key ring.")
+        self.keys = dict(keys)
+        self.active_key_id = active_key_id
+        self.algorithm = algorithm
+
+    @classmethod
+    def from_env(cls) -> "KeyRing":
+        """
+        Builds the key ring from the environment.
+
+        JWT_SIGNING_KEYS holds comma separated `kid:secret` pairs and JWT_ACTIVE_KEY_ID
+        selects the one used for signing. Without them, the single JWT_SECRET_KEY
+        (or SECRET_KEY) is used under the `default` key id.
+        """
+        algorithm = os.getenv("JWT_ALGORITHM", os.getenv("ALGORITHM", "HS256"))
+        raw_keys = os.getenv("JWT_SIGNING_KEYS", "")
+        keys = {}
+        for pair in raw_keys.split(","):
+            if not pair.strip():
+                continue
+            key_id, _, secret = pair.strip().partition(":")
+            if not secret:
+                raise ValueError(f"Malformed JWT_SIGNING_KEYS entry for key id '{key_id}'.")
+            keys[key_id] = secret
+
+        if keys:
+            active_key_id = os.getenv("JWT_ACTIVE_KEY_ID", next(iter(keys)))
+            return cls(keys, active_key_id, algorithm)
+
+        secret = os.getenv("JWT_SECRET_KEY") or os.getenv("SECRET_KEY")
+        if not secret:
+            raise ValueError("No JWT signing key configured. Set JWT_SIGNING_KEYS or JWT_SECRET_KEY.")
+        return cls({DEFAULT_KEY_ID: secret}, DEFAULT_KEY_ID, algorithm)
+
+
+class TokenIssuer:
+    """Signs access tokens with the key ring's active key."""
+
+    def __init__(self, key_ring: KeyRing, expire_minutes: int = 30, issuer: Optional[str] = None):
+        self.key_ring = key_ring
+        self.expire_minutes = expire_minutes
+        self.issuer = issuer
+
+    def issue(self, subject: str, extra_claims: Optional[Dict[str, Any]] = None) -> str:
+        now = datetime.now(timezone.utc)
+        claims = dict(extra_claims or {})
+        claims.update({
+            "sub": subject,
+            "iat": now,
+            "exp": now + timedelta(minutes=self.expire_minutes),
+        })
+        if self.issuer:
+            claims["iss"] = self.issuer
+        key_id = self.key_ring.active_key_id
+        return jwt.encode(
+            claims,
+            self.key_ring.keys[key_id],
+            algorithm=self.key_ring.algorithm,
+            headers={"kid": key_id},
+        )
+
+
+class VerifiedTokenCache:
+    """
+    A small thread-safe LRU of tokens whose signature has already been checked.
+
+    Entries are keyed by a SHA-256 of the token, so raw tokens are never held in memory,
+    and each entry is only served until the token's own `exp`.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str, valid_key_ids) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, expires_at, key_id = entry
+            # Expired tokens, and tokens signed by a key that has since been retired, must be
+            # re-verified (and rejected) rather than served from the cache.
+            if expires_at <= now or key_id not in valid_key_ids:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: Dict[str, Any], key_id: str):
+        expires_at = claims.get("exp")
+        if expires_at is None or self.maxsize <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims, float(expires_at), key_id)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TokenVerifier:
+    """Verifies access tokens locally against the key ring, caching successful results."""
+
+    def __init__(self, key_ring: KeyRing, cache: Optional[VerifiedTokenCache] = None, issuer: Optional[str] = None):
+        self.key_ring = key_ring
+        self.cache = cache if cache is not None else VerifiedTokenCache()
+        self.issuer = issuer
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        claims = self.cache.get(token, self.key_ring.keys)
+        if claims is not None:
+            return claims
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError as e:
+            raise InvalidTokenError(f"Malformed token: {e}")
+        key_id = header.get("kid", DEFAULT_KEY_ID)
+        secret = self.key_ring.keys.get(key_id)
+        if secret is None:
+            raise InvalidTokenError(f"Token signed with unknown key id '{key_id}'.")
+
+        try:
+            claims = jwt.decode(
+                token,
+                secret,
+                algorithms=[self.key_ring.algorithm],
+                issuer=self.issuer,
+                options={"require_exp": True, "require_sub": True},
+            )
+        except JWTError as e:
+            raise InvalidTokenError(str(e))
+
+        self.cache.put(token, claims, key_id)
+        return claims
@@ -0,0 +1,205 @@
+# common/background_store.py
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# File layout: fixed header followed by the raw pixel buffer in PIL's own memory layout.
+MAGIC = b"BGS1"
+HEADER = struct.Struct("<4s8sII")
+HEADER_SIZE = 64  # Keeps the pixel data 64-byte aligned.
+# Modes PIL can map straight onto a buffer without copying (RGB is stored 4 bytes/pixel
+# internally, so it is kept as RGBX).
+MAPPABLE_MODES = {"L", "RGBA", "RGBX"}
+# Files are "touched" at most this often, to record use for LRU eviction.
+TOUCH_INTERVAL_SECONDS = 60
+# Temporary files older than this belong to a publisher that died mid-write.
+STALE_TMP_SECONDS = 600
+
+Decoder = Callable[[str], Image.Image]
+
+
+def _default_store_dir() -> str:
+    # /dev/shm keeps the buffers in RAM (page cache) and is shared by all processes on the node.
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "background-store")
+
+
+def _decode_full(path: str) -> Image.Image:
+    with Image.open(path) as source:
+        source.load()
+        return source.copy()
+
+
+class SharedBackgroundStore:
+    """
+    Node-wide store of decoded backgrounds shared by every process through memory-mapped files.
+
+    The first process to need a background decodes it, writes the raw pixels to
+    `<store dir>/<key>.raw` and atomically renames it into place; every other process,
+    in any container that mounts the same directory, maps that file read-only and wraps it
+    in a PIL image without decoding or copying. Keys cover the source path, its mtime and
+    the variant name (e.g. a reduced-size derivative), so edited files are never served stale.
+    Total size is bounded, counting partly written temporary files; the least recently
+    used files are evicted first. Publishing is serialised through a fixed set of lock
+    files in `<store dir>/locks/` (one per leading key byte) that are never deleted, so two
+    processes can never hold locks on different inodes for the same key.
+    """
+
+    def __init__(self, store_dir: Optional[str] = None, max_bytes: int = 1024 * 1024 * 1024, max_mapped: int = 64):
+        self.store_dir = store_dir or _default_store_dir()
+        self.max_bytes = max_bytes
+        self.max_mapped = max_mapped
+        self.lock_dir = os.path.join(self.store_dir, "locks")
+        os.makedirs(self.lock_dir, exist_ok=True)
+        # Per-process handles to already-mapped files (the pages themselves are shared).
+        self._mapped: "OrderedDict[str, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SharedBackgroundStore":
+        return cls(
+            store_dir=os.getenv("BACKGROUND_STORE_DIR") or None,
+            max_bytes=int(os.getenv("BACKGROUND_STORE_MAX_MB", "1024")) * 1024 * 1024,
+        )
+
+    def _key(self, path: str, variant: str) -> str:
+        stat_result = os.stat(path)
+        basis = f"{os.path.abspath(path)}:{stat_result.st_mtime_ns}:{stat_result.st_size}:{variant}"
+        return hashlib.sha1(basis.encode("utf-8")).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.store_dir, f"{key}.raw")
+
+    def get(self, path: str, variant: str = "full", decode: Optional[Decoder] = None) -> Image.Image:
+        """
+        Returns the background as a read-only image backed by shared memory.
+        `decode` produces the image for `variant` on a miss; it defaults to a full decode.
+        Callers must copy or convert the image before drawing on it.
+        """
+        key = self._key(path, variant)
+        with self._lock:
+            image = self._mapped.get(key)
+            if image is not None:
+                self._mapped.move_to_end(key)
+                return image
+
+        image = self._map(key)
+        if image is None:
+            self._publish(key, path, decode or _decode_full)
+            image = self._map(key)
+        if image is None:
+            raise OSError(f"Background store could not map {path} ({variant})")
+
+        with self._lock:
+            self._mapped[key] = image
+            while len(self._mapped) > self.max_mapped:
+                self._mapped.popitem(last=False)
+        return image
+
+    def _map(self, key: str) -> Optional[Image.Image]:
+        file_path = self._file(key)
+        try:
+            with open(file_path, "rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        magic, raw_mode, width, height = HEADER.unpack_from(buffer, 0)
+        mode = raw_mode.rstrip(b"\0").decode("ascii")
+        if magic != MAGIC or mode not in MAPPABLE_MODES:
+            buffer.close()
+            return None
+        self._touch(file_path)
+        pixels = memoryview(buffer)[HEADER_SIZE:]
+        # The image keeps the mapping alive; the kernel keeps the pages shared.
+        return Image.frombuffer(mode, (width, height), pixels, "raw", mode, 0, 1)
+
+    def _touch(self, file_path: str):
+        try:
+            if time.time() - os.stat(file_path).st_mtime > TOUCH_INTERVAL_SECONDS:
+                os.utime(file_path)
+        except OSError:
+            pass
+
+    def _publish(self, key: str, path: str, decode: Decoder):
+        """Decodes once per node: the flock makes concurrent processes wait for the first decoder."""
+        # 256 lock stripes: unrelated keys rarely share one, and their number never grows.
+        lock_path = os.path.join(self.lock_dir, f"{key[:2]}.lock")
+        with open(lock_path, "a+b") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if os.path.exists(self._file(key)):
+                    return
+                image = decode(path)
+                if image.mode not in MAPPABLE_MODES:
+                    image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGBX")
+
+                fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, prefix=f".{key}.", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as out:
+                        header = HEADER.pack(MAGIC, image.mode.encode("ascii"), image.width, image.height)
+                        out.write(header.ljust(HEADER_SIZE, b"\0"))
+                        out.write(image.tobytes("raw", image.mode))
+                    os.replace(tmp_path, self._file(key))
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+                logger.info(f"Background store: published {os.path.basename(path)} ({image.mode} {image.width}x{image.height})")
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        self._evict(keep=self._file(key))
+
+    def _evict(self, keep: Optional[str] = None):
+        """Deletes least recently used files until the store fits in `max_bytes`, after
+        sweeping temporary files left behind by crashed publishers. Processes that still
+        map an evicted file keep a valid mapping until they drop it."""
+        entries = []
+        total = 0
+        now = time.time()
+        for entry in os.scandir(self.store_dir):
+            is_tmp = entry.name.endswith(".tmp")
+            if not (is_tmp or entry.name.endswith(".raw")):
+                continue
+            try:
+                stat_result = entry.stat()
+            except FileNotFoundError:
+                continue
+            if is_tmp:
+                if now - stat_result.st_mtime > STALE_TMP_SECONDS:
+                    self._remove(entry.path)
+                else:
+                    total += stat_result.st_size  # Still being written; it will be renamed soon.
+                continue
+            entries.append((stat_result.st_mtime, stat_result.st_size, entry.path))
+            total += stat_result.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, file_path in entries:
+            if total <= self.max_bytes:
+                break
+            if file_path == keep:
+                continue
+            if self._remove(file_path):
+                total -= size
+
+    @staticmethod
+    def _remove(file_path: str) -> bool:
+        try:
+            os.remove(file_path)
+            return True
+        except FileNotFoundError:
+            return False
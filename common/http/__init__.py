@@ -0,0 +1,10 @@
+# common/http/__init__.py
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .client import ServiceClient, ServiceUnavailableError
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "ServiceClient",
+    "ServiceUnavailableError",
+]
@@ -0,0 +1,76 @@
+# common/http/circuit_breaker.py
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    -> calls go through; `failure_threshold` consecutive failures open the circuit.
+    open      -> calls fail fast with CircuitOpenError for `reset_timeout` seconds.
+    half_open -> a single probe call is let through; success closes the circuit,
+                 failure re-opens it for another `reset_timeout`.
+
+    Every `before_call()` that does not raise must be resolved by exactly one of
+    `record_success()`, `record_failure()` or `release()`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.opened_total = 0
+        self.rejected_total = 0
+
+    def before_call(self):
+        """Raises CircuitOpenError if the call must not be attempted right now."""
+        if self.state == self.CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.reset_timeout - now
+            if remaining > 0:
+                self.rejected_total += 1
+                raise CircuitOpenError(self.name, remaining)
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self._probe_in_flight:
+            self.rejected_total += 1
+            raise CircuitOpenError(self.name, self.reset_timeout)
+        self._probe_in_flight = True
+
+    def record_success(self):
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened_total += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self):
+        """Resolves a call that ended without an outcome (e.g. it was cancelled), so a
+        half-open circuit lets the next call probe instead of waiting for this one forever."""
+        self._probe_in_flight = False
@@ -0,0 +1,169 @@
+# common/http/client.py
+import asyncio
+import logging
+import random
+from typing import Any, Optional
+
+import httpx
+
+from .circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+
+
+class ServiceUnavailableError(Exception):
+    """Raised when a downstream service could not be reached or kept failing after retries."""
+
+
+class ServiceClient:
+    """
+    Pooled async HTTP client for service-to-service calls.
+
+    One instance per downstream service, shared for the life of the process, so TCP
+    connections are reused. Every call has strict connect/read timeouts; idempotent calls
+    are retried with full-jitter exponential backoff, optionally hedged with a second
+    request when the first is slow, and all calls go through a circuit breaker so a
+    dead dependency fails fast instead of tying up workers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        connect_timeout: float = 1.0,
+        read_timeout: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        retries: int = 2,
+        backoff_base: float = 0.05,
+        backoff_max: float = 1.0,
+        hedge_delay: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_delay = hedge_delay
+        self.breaker = breaker or CircuitBreaker(name)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so the client binds to the event loop that actually uses it.
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=self.limits)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _send_hedged(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Sends the request, and a duplicate if no response arrived within `hedge_delay`."""
+        primary = asyncio.ensure_future(self.client.request(method, url, **kwargs))
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay)
+            if done:
+                return primary.result()
+
+            hedge = asyncio.ensure_future(self.client.request(method, url, **kwargs))
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Sends a request through the breaker, retrying idempotent calls on httpx errors
+        and 502/503/504. Raises CircuitOpenError or ServiceUnavailableError.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        attempts = self.retries + 1 if idempotent else 1
+        hedged = idempotent and self.hedge_delay is not None
+
+        last_error: Optional[Exception] = None
+        for attempt in range(attempts):
+            self.breaker.before_call()
+            try:
+                if hedged:
+                    response = await self._send_hedged(method, url, **kwargs)
+                else:
+                    response = await self.client.request(method, url, **kwargs)
+            except httpx.HTTPError as e:
+                self.breaker.record_failure()
+                last_error = e
+                logger.warning(f"{self.name}: {method} {url} failed on attempt {attempt + 1}/{attempts}: {e!r}")
+            except BaseException:
+                # Cancelled (client gone, hedge lost, shutdown) or an unexpected error: the
+                # attempt says nothing about the dependency but must not keep the probe slot.
+                self.breaker.release()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                last_error = httpx.HTTPStatusError(
+                    f"{response.status_code} from {self.name}", request=response.request, response=response
+                )
+                logger.warning(
+                    f"{self.name}: {method} {url} returned {response.status_code} on attempt {attempt + 1}/{attempts}"
+                )
+            if attempt + 1 < attempts:
+                await asyncio.sleep(self._backoff(attempt))
+
+        raise ServiceUnavailableError(f"{self.name} unavailable after {attempts} attempt(s): {last_error}")
+
+    async def get_json(self, url: str, **kwargs) -> Any:
+        response = await self.request("GET", url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def prometheus_metrics(self) -> str:
+        """Renders the breaker state and counters in Prometheus text format."""
+        states = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+        labels = f'{{service="{self.name}"}}'
+        return "\n".join([
+            "# HELP service_client_circuit_state Circuit state (0=closed, 1=half_open, 2=open).",
+            "# TYPE service_client_circuit_state gauge",
+            f"service_client_circuit_state{labels} {states[self.breaker.state]}",
+            "# HELP service_client_circuit_opened_total Times the circuit has opened.",
+            "# TYPE service_client_circuit_opened_total counter",
+            f"service_client_circuit_opened_total{labels} {self.breaker.opened_total}",
+            "# HELP service_client_circuit_rejected_total Calls rejected while the circuit was open.",
+            "# TYPE service_client_circuit_rejected_total counter",
+            f"service_client_circuit_rejected_total{labels} {self.breaker.rejected_total}",
+        ]) + "\n"
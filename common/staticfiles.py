@@ -0,0 +1,209 @@
+# common/staticfiles.py
+import hashlib
+import os
+import re
+from email.utils import formatdate
+from mimetypes import guess_type
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+# Uploaded backgrounds and rendered outputs are named `<uuid4>.<ext>` and never rewritten,
+# so the name alone identifies the content.
+CONTENT_ADDRESSED_NAME = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}(\.[A-Za-z0-9]+)+$"
+)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+# Precompressed siblings (`file.ext.br`, `file.ext.gz`) in order of preference.
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+SINGLE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def is_content_addressed(path: str) -> bool:
+    return bool(CONTENT_ADDRESSED_NAME.match(os.path.basename(path)))
+
+
+def strong_etag(path: str, stat_result: os.stat_result, encoding: Optional[str] = None) -> str:
+    """
+    Content-addressed files are identified by name and size; anything else also by
+    mtime and inode. Each content encoding of the same file gets its own tag.
+    """
+    if is_content_addressed(path):
+        basis = f"{os.path.basename(path)}:{stat_result.st_size}"
+    else:
+        basis = f"{path}:{stat_result.st_size}:{stat_result.st_mtime_ns}:{stat_result.st_ino}"
+    digest = hashlib.sha1(basis.encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+
+def _accepted_encodings(request_headers: Headers) -> set:
+    accepted = set()
+    for part in request_headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parses a single `bytes=` range into an inclusive (start, end) pair.
+    Returns None for ranges that cannot be satisfied. Raises ValueError for
+    syntax this module does not handle (e.g. multiple ranges), so callers can
+    fall back to a full 200 response as RFC 9110 allows.
+    """
+    match = SINGLE_RANGE.match(range_header.strip())
+    if match is None:
+        raise ValueError(f"Unsupported range: {range_header}")
+    first, last = match.groups()
+    if not first and not last:
+        raise ValueError(f"Unsupported range: {range_header}")
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            return None
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+class StaticFileResponse(FileResponse):
+    """
+    FileResponse with single-range (206/416) support, If-Range handling and zero-copy
+    transmission when the ASGI server offers the `zerocopysend` or `pathsend` extension.
+    """
+
+    def __init__(self, path: str, *, etag: str, cache_control: str, encoding: Optional[str] = None,
+                 media_type: Optional[str] = None, vary: bool = False, **kwargs):
+        super().__init__(path, media_type=media_type, **kwargs)
+        self.headers["etag"] = etag
+        self.headers["cache-control"] = cache_control
+        self.headers["accept-ranges"] = "bytes"
+        if encoding:
+            self.headers["content-encoding"] = encoding
+        if vary:
+            self.headers["vary"] = "Accept-Encoding"
+
+    def set_stat_headers(self, stat_result: os.stat_result) -> None:
+        self.headers.setdefault("content-length", str(stat_result.st_size))
+        self.headers.setdefault("last-modified", formatdate(stat_result.st_mtime, usegmt=True))
+
+    def _requested_range(self, request_headers: Headers) -> Tuple[int, Optional[Tuple[int, int]]]:
+        """Returns the status to send and the byte range to send (None means the whole file)."""
+        range_header = request_headers.get("range")
+        if not range_header or self.status_code != 200:
+            return self.status_code, None
+        if_range = request_headers.get("if-range")
+        if if_range is not None and if_range.strip() not in (self.headers["etag"], self.headers["last-modified"]):
+            return 200, None
+        try:
+            byte_range = parse_range(range_header, self.stat_result.st_size)
+        except ValueError:
+            return 200, None
+        if byte_range is None:
+            return 416, None
+        return 206, byte_range
+
+    async def __call__(self, scope, receive, send) -> None:
+        if self.stat_result is None:
+            self.stat_result = await anyio.to_thread.run_sync(os.stat, self.path)
+            self.set_stat_headers(self.stat_result)
+        size = self.stat_result.st_size
+        status_code, byte_range = self._requested_range(Headers(scope=scope))
+
+        if status_code == 416:
+            self.headers["content-range"] = f"bytes */{size}"
+            self.headers["content-length"] = "0"
+            await send({"type": "http.response.start", "status": 416, "headers": self.raw_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        start, end = byte_range if byte_range else (0, size - 1)
+        count = end - start + 1 if size else 0
+        if byte_range:
+            self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+            self.headers["content-length"] = str(count)
+        await send({"type": "http.response.start", "status": status_code, "headers": self.raw_headers})
+
+        extensions = scope.get("extensions") or {}
+        if scope["method"].upper() == "HEAD" or count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in extensions:
+            # sendfile(2): the kernel copies page-cache pages straight to the socket.
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": start,
+                    "count": count,
+                    "more_body": False,
+                })
+        elif byte_range is None and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                remaining = count
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """
+    StaticFiles for content-addressed assets (uuid-named backgrounds and outputs).
+
+    * uuid-named files get a one-year `immutable` Cache-Control, anything else `no-cache`
+      so it is revalidated with its ETag;
+    * strong ETags, with If-None-Match / If-Modified-Since answered by 304;
+    * single byte ranges (206), unsatisfiable ranges (416) and If-Range;
+    * precompressed `.br` / `.gz` siblings served when the client accepts them;
+    * zero-copy sendfile when the server supports the ASGI zerocopysend extension.
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        media_type = guess_type(full_path)[0] or "application/octet-stream"
+
+        served_path, served_stat, encoding, has_variants = full_path, stat_result, None, False
+        accepted = _accepted_encodings(request_headers)
+        for coding, suffix in PRECOMPRESSED_ENCODINGS:
+            try:
+                variant_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            has_variants = True
+            if coding in accepted and encoding is None:
+                served_path, served_stat, encoding = full_path + suffix, variant_stat, coding
+
+        cache_control = IMMUTABLE_CACHE_CONTROL if is_content_addressed(full_path) else REVALIDATE_CACHE_CONTROL
+        response = StaticFileResponse(
+            served_path,
+            status_code=status_code,
+            stat_result=served_stat,
+            media_type=media_type,
+            etag=strong_etag(full_path, served_stat, encoding),
+            cache_control=cache_control,
+            encoding=encoding,
+            vary=has_variants,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,62 @@
+# common/tests/test_background_store.py
+import os
+import time
+
+from PIL import Image
+
+from common import background_store
+from common.background_store import SharedBackgroundStore
+
+
+def make_backgrounds(directory, count, size=(64, 64)):
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, f"bg{index}.png")
+        Image.new("RGB", size, (index * 40, 0, 0)).save(path)
+        paths.append(path)
+    return paths
+
+
+def store_files(store, suffix):
+    return sorted(name for name in os.listdir(store.store_dir) if name.endswith(suffix))
+
+
+def test_get_maps_the_decoded_pixels(tmp_path):
+    store = SharedBackgroundStore(str(tmp_path / "store"))
+    path, = make_backgrounds(str(tmp_path), 1)
+    image = store.get(path)
+    assert image.size == (64, 64)
+    assert image.convert("RGB").getpixel((0, 0)) == (0, 0, 0)
+    assert len(store_files(store, ".raw")) == 1
+
+
+def test_eviction_keeps_the_fixed_set_of_lock_files(tmp_path):
+    # Each 64x64 RGBX file is 64 header bytes + 16 KiB; the budget fits two.
+    store = SharedBackgroundStore(str(tmp_path / "store"), max_bytes=2 * (64 + 64 * 64 * 4))
+    for path in make_backgrounds(str(tmp_path), 4):
+        store.get(path)
+    assert len(store_files(store, ".raw")) == 2
+    locks = os.listdir(store.lock_dir)
+    assert 1 <= len(locks) <= 4
+    assert all(len(name) == len("00.lock") for name in locks)  # One stripe per leading key byte.
+    assert store_files(store, ".lock") == []
+
+
+def test_eviction_sweeps_stale_and_counts_fresh_tmp_files(tmp_path):
+    store = SharedBackgroundStore(str(tmp_path / "store"), max_bytes=2 * (64 + 64 * 64 * 4))
+    stale = os.path.join(store.store_dir, ".dead.abc.tmp")
+    fresh = os.path.join(store.store_dir, ".busy.def.tmp")
+    for tmp in (stale, fresh):
+        with open(tmp, "wb") as file:
+            file.write(b"\0" * (64 + 64 * 64 * 4))
+    old = time.time() - background_store.STALE_TMP_SECONDS - 1
+    os.utime(stale, (old, old))
+
+    first, second = make_backgrounds(str(tmp_path), 2)
+    store.get(first)
+    store.get(second)
+
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
+    # The in-progress file takes one slot of the budget, so only the newest background stays.
+    assert len(store_files(store, ".raw")) == 1
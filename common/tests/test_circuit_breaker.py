@@ -0,0 +1,149 @@
+# common/tests/test_circuit_breaker.py
+import asyncio
+
+import httpx
+import pytest
+
+from common.http import circuit_breaker
+from common.http.circuit_breaker import CircuitBreaker, CircuitOpenError
+from common.http.client import ServiceClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake)
+    return fake
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=3, reset_timeout=10)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_total == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.rejected_total == 1
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=2)
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=1, reset_timeout=10)
+    breaker.before_call()
+    breaker.record_failure()
+
+    clock.now += 10
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time.
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=1, reset_timeout=10)
+    breaker.before_call()
+    breaker.record_failure()
+
+    clock.now += 10
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_total == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_released_probe_lets_next_call_probe(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=1, reset_timeout=10)
+    breaker.before_call()
+    breaker.record_failure()
+
+    clock.now += 10
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()  # Would raise if the abandoned probe still held the slot.
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def _client(handler, breaker: CircuitBreaker, **kwargs) -> ServiceClient:
+    client = ServiceClient("svc", "http://svc", breaker=breaker, retries=0, backoff_base=0, **kwargs)
+    client._client = httpx.AsyncClient(base_url="http://svc", transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_cancelled_probe_does_not_wedge_half_open(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=1, reset_timeout=10)
+    breaker.before_call()
+    breaker.record_failure()
+    clock.now += 10
+
+    async def run():
+        release = asyncio.Event()
+
+        async def handler(request):
+            if request.url.path == "/slow":
+                await release.wait()
+            return httpx.Response(200, json={"ok": True})
+
+        client = _client(handler, breaker)
+        probe = asyncio.ensure_future(client.request("GET", "/slow"))
+        await asyncio.sleep(0)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        response = await client.request("GET", "/fast")
+        assert response.status_code == 200
+        await client.aclose()
+
+    asyncio.run(run())
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_non_transport_httpx_error_counts_as_failure(clock):
+    breaker = CircuitBreaker("svc", failure_threshold=1, reset_timeout=10)
+
+    def handler(request):
+        raise httpx.DecodingError("bad gzip", request=request)
+
+    async def run():
+        client = _client(handler, breaker)
+        with pytest.raises(Exception) as raised:
+            await client.request("GET", "/")
+        await client.aclose()
+        return raised.value
+
+    error = asyncio.run(run())
+    assert type(error).__name__ == "ServiceUnavailableError"
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,48 @@
+# common/tests/test_text_render.py
+from types import SimpleNamespace
+
+from PIL import Image
+
+from common.text_render import block_layout, block_texts, draw_blocks
+
+BLOCKS = [
+    {"x": 10, "y": 20, "font_size": 40, "color": "#FF0000", "default_text": "Hello"},
+    {"x": 10, "y": 100, "font_size": 30, "color": "#0000FF", "default_text": "World"},
+]
+
+
+def test_unmapped_blocks_are_left_blank_by_default():
+    assert block_texts(BLOCKS, ["Hi"]) == ["Hi", ""]
+    assert block_texts(BLOCKS, [None, "b"]) == ["", "b"]
+
+
+def test_unmapped_blocks_keep_their_default_text_when_filling_defaults():
+    assert block_texts(BLOCKS, ["Hi", None], fill_defaults=True) == ["Hi", "World"]
+    assert block_texts(BLOCKS, ["Hi"], fill_defaults=True) == ["Hi", "World"]
+    assert block_texts(BLOCKS, [], fill_defaults=True) == ["Hello", "World"]
+
+
+def test_empty_text_clears_the_block_and_extra_texts_are_ignored():
+    assert block_texts(BLOCKS, ["", "b", "extra"], fill_defaults=True) == ["", "b"]
+
+
+def test_layout_scales_position_and_font_size():
+    layout = block_layout(BLOCKS[0], 0.5)
+    assert layout.position == (5, 10)
+    assert layout.color == "#FF0000"
+    assert block_layout(BLOCKS[1], 0.01).font is not None  # Font size never drops below 1.
+
+
+def test_dict_and_model_blocks_render_identically():
+    models = [SimpleNamespace(**block) for block in BLOCKS]
+    from_dicts = draw_blocks(Image.new("RGB", (200, 200), "white"), BLOCKS, ["Hi", None], fill_defaults=True)
+    from_models = draw_blocks(Image.new("RGB", (200, 200), "white"), models, ["Hi", None], fill_defaults=True)
+    assert from_dicts.tobytes() == from_models.tobytes()
+    assert from_dicts.convert("L").getextrema() != (255, 255)
+
+
+def test_nothing_is_drawn_for_empty_or_missing_texts():
+    image = draw_blocks(Image.new("RGB", (200, 200), "white"), BLOCKS, ["", ""], fill_defaults=True)
+    assert image.convert("L").getextrema() == (255, 255)
+    image = draw_blocks(Image.new("RGB", (200, 200), "white"), BLOCKS, [])
+    assert image.convert("L").getextrema() == (255, 255)
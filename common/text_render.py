@@ -0,0 +1,70 @@
+# common/text_render.py
+import logging
+import os
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+FONT_PATH = os.getenv("FONT_PATH", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+
+
+@lru_cache(maxsize=256)  # Reduced-size renders use scaled font sizes too.
+def get_font(size: int) -> ImageFont.FreeTypeFont:
+    """Loads (once per size and process) the render font, falling back to PIL's built-in font."""
+    try:
+        return ImageFont.truetype(FONT_PATH, size)
+    except IOError:
+        logger.warning(f"Font not found at {FONT_PATH}. Using default font.")
+        return ImageFont.load_default()
+
+
+class BlockLayout(NamedTuple):
+    position: Tuple[int, int]
+    font: ImageFont.FreeTypeFont
+    color: str
+
+
+def _field(block, name: str):
+    # Templates arrive as pydantic models in render-service and as plain dicts in Celery tasks.
+    return block[name] if isinstance(block, Mapping) else getattr(block, name)
+
+
+def block_layout(block, scale: float = 1.0) -> BlockLayout:
+    """Where and how a template text block is drawn on an image `scale` times the template's size."""
+    return BlockLayout(
+        (round(_field(block, "x") * scale), round(_field(block, "y") * scale)),
+        get_font(max(1, round(_field(block, "font_size") * scale))),
+        _field(block, "color"),
+    )
+
+
+def block_texts(text_blocks: Sequence, texts: Sequence[Optional[str]], fill_defaults: bool = False) -> List[str]:
+    """
+    The text to draw in every block: `texts[i]`, or, for a block whose text is None or
+    missing, its default text when `fill_defaults` is set and nothing otherwise.
+    Texts beyond the template's blocks are ignored.
+    """
+    return [
+        texts[index] if index < len(texts) and texts[index] is not None
+        else _field(block, "default_text") if fill_defaults else ""
+        for index, block in enumerate(text_blocks)
+    ]
+
+
+def draw_blocks(image: Image.Image, text_blocks: Sequence, texts: Sequence[Optional[str]], scale: float = 1.0,
+                fill_defaults: bool = False) -> Image.Image:
+    """
+    Draws the template's text blocks onto `image` in place, with block geometry scaled by
+    `scale`. Single renders draw only the texts they were given; campaigns and live
+    previews pass `fill_defaults` so unmapped blocks keep their default text.
+    """
+    draw = ImageDraw.Draw(image)
+    for block, text in zip(text_blocks, block_texts(text_blocks, texts, fill_defaults)):
+        if text:
+            position, font, color = block_layout(block, scale)
+            draw.text(position, text, fill=color, font=font)
+    return image
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, status
+
+logger = logging.getLogger(__name__)
+
+# Cost is expressed in "megapixel units": one megapixel of PNG output costs 1.0.
+# PDFs pay for the intermediate PNG plus the WeasyPrint layout and embedding pass.
+FORMAT_COST_WEIGHTS = {
+    "png": 1.0,
+    "pdf": 2.5,
+}
+BLOCK_COST = 0.05
+
+MAX_CONCURRENT_COST = float(os.getenv("RENDER_MAX_CONCURRENT_COST", "48"))
+MAX_QUEUE_DEPTH = int(os.getenv("RENDER_MAX_QUEUE_DEPTH", "32"))
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("RENDER_QUEUE_TIMEOUT_SECONDS", "2.0"))
+
+
+def estimate_cost(width: int, height: int, block_count: int, output_format: str = "png") -> float:
+    """Estimates the relative cost of a render from its output size, text blocks and format."""
+    weight = FORMAT_COST_WEIGHTS.get(output_format, max(FORMAT_COST_WEIGHTS.values()))
+    megapixels = (width * height) / 1_000_000
+    return megapixels * weight + block_count * BLOCK_COST
+
+
+class AdmissionController:
+    """
+    Caps the total estimated cost of renders running concurrently on this instance.
+
+    Requests that do not fit wait in a bounded FIFO queue until capacity frees up or
+    their deadline passes. When the queue is full, or the deadline expires, the request
+    is shed with a 429 and a Retry-After hint instead of piling more work on the instance.
+    """
+
+    def __init__(self, max_cost: float, max_queue_depth: int, queue_timeout: float):
+        self.max_cost = max_cost
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+
+        self._in_flight_cost = 0.0
+        self._in_flight = 0
+        self._waiters = deque()
+        self._avg_duration = 1.0
+
+        self.admitted_total = 0
+        self.shed_total = {"queue_full": 0, "timeout": 0}
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _has_capacity(self, cost: float) -> bool:
+        # An oversized request is still allowed to run alone rather than never running.
+        return self._in_flight == 0 or self._in_flight_cost + cost <= self.max_cost
+
+    def _take(self, cost: float):
+        self._in_flight_cost += cost
+        self._in_flight += 1
+        self.admitted_total += 1
+
+    def _wake_waiters(self):
+        """Admits queued requests in arrival order while there is capacity for the head."""
+        while self._waiters:
+            cost, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._has_capacity(cost):
+                break
+            self._waiters.popleft()
+            self._take(cost)
+            future.set_result(None)
+
+    def _retry_after(self) -> int:
+        """Estimates how long until the queue ahead of a new request has drained."""
+        return max(1, math.ceil(self._avg_duration * (self.queue_depth + 1) / max(self._in_flight, 1)))
+
+    def _shed(self, reason: str):
+        self.shed_total[reason] += 1
+        retry_after = self._retry_after()
+        logger.warning(
+            f"Shedding render request ({reason}): in-flight cost {self._in_flight_cost:.2f}/{self.max_cost}, "
+            f"queue depth {self.queue_depth}. Retry after {retry_after}s."
+        )
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Render service is at capacity. Please retry later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    async def acquire(self, cost: float):
+        cost = min(cost, self.max_cost)
+        if not self._waiters and self._has_capacity(cost):
+            self._take(cost)
+            return
+        if self.queue_depth >= self.max_queue_depth:
+            self._shed("queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (cost, future)
+        self._waiters.append(entry)
+        try:
+            await asyncio.wait_for(future, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(entry)
+            self._shed("timeout")
+        except asyncio.CancelledError:
+            self._discard(entry)
+            if future.done() and not future.cancelled():
+                self.release(cost)
+            raise
+
+    def _discard(self, entry):
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            pass
+        # The head of the queue may have been the only thing blocking smaller requests.
+        self._wake_waiters()
+
+    def release(self, cost: float):
+        cost = min(cost, self.max_cost)
+        self._in_flight_cost = max(0.0, self._in_flight_cost - cost)
+        self._in_flight = max(0, self._in_flight - 1)
+        self._wake_waiters()
+
+    @asynccontextmanager
+    async def admit(self, cost: float):
+        """Holds `cost` units of render capacity for the duration of the block."""
+        await self.acquire(cost)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self._avg_duration = 0.8 * self._avg_duration + 0.2 * elapsed
+            self.release(cost)
+
+    def prometheus_metrics(self) -> str:
+        """Renders the controller's gauges and counters in Prometheus text format."""
+        lines = [
+            "# HELP render_admission_queue_depth Render requests waiting for capacity.",
+            "# TYPE render_admission_queue_depth gauge",
+            f"render_admission_queue_depth {self.queue_depth}",
+            "# HELP render_admission_in_flight Render requests currently executing.",
+            "# TYPE render_admission_in_flight gauge",
+            f"render_admission_in_flight {self._in_flight}",
+            "# HELP render_admission_in_flight_cost Estimated cost of renders currently executing.",
+            "# TYPE render_admission_in_flight_cost gauge",
+            f"render_admission_in_flight_cost {self._in_flight_cost:.4f}",
+            "# HELP render_admission_max_cost Configured concurrent cost limit.",
+            "# TYPE render_admission_max_cost gauge",
+            f"render_admission_max_cost {self.max_cost}",
+            "# HELP render_admission_admitted_total Render requests admitted.",
+            "# TYPE render_admission_admitted_total counter",
+            f"render_admission_admitted_total {self.admitted_total}",
+            "# HELP render_admission_shed_total Render requests rejected with 429.",
+            "# TYPE render_admission_shed_total counter",
+        ]
+        for reason, count in self.shed_total.items():
+            lines.append(f'render_admission_shed_total{{reason="{reason}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+admission_controller = AdmissionController(
+    max_cost=MAX_CONCURRENT_COST,
+    max_queue_depth=MAX_QUEUE_DEPTH,
+    queue_timeout=QUEUE_TIMEOUT_SECONDS,
+)
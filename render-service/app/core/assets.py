@@ -0,0 +1,70 @@
+import logging
+import os
+from functools import partial
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from common.background_store import SharedBackgroundStore
+
+logger = logging.getLogger(__name__)
+
+STATIC_BACKGROUNDS_PATH = os.getenv("STATIC_BACKGROUNDS_PATH", "/app/static/backgrounds")
+
+# Decoded backgrounds live in a node-wide memory-mapped store shared with every other
+# uvicorn and Celery worker process, instead of one private copy per process.
+background_store = SharedBackgroundStore.from_env()
+
+
+# libjpeg can decode directly at 1/2, 1/4 or 1/8 scale (DCT scaling); the same factors
+# are used for the stored reduced derivatives of every background.
+REDUCTION_FACTORS = (8, 4, 2)
+
+
+def reduction_factor(full_size: Tuple[int, int], size: Tuple[int, int]) -> int:
+    """Largest factor whose derivative is still at least `size`, so it is only ever downscaled."""
+    for factor in REDUCTION_FACTORS:
+        if full_size[0] // factor >= size[0] and full_size[1] // factor >= size[1]:
+            return factor
+    return 1
+
+
+def _decode_reduced(path: str, factor: int) -> Image.Image:
+    with Image.open(path) as source:
+        reduced_size = (max(1, source.width // factor), max(1, source.height // factor))
+        if source.format == "JPEG":
+            # Draft mode makes libjpeg skip the discarded frequencies instead of
+            # decoding every pixel and throwing most of them away.
+            source.draft("L" if source.mode == "L" else "RGB", reduced_size)
+        source.load()
+        image = source if source.mode in ("L", "RGB", "RGBA") else source.convert(
+            "RGBA" if "A" in source.getbands() or "transparency" in source.info else "RGB"
+        )
+        if image.size == reduced_size:
+            return image.copy()
+        # Box filtering averages each factor x factor block, like the DCT scaling does.
+        return image.resize(reduced_size, Image.BOX)
+
+
+def load_background(path: str, size: Optional[Tuple[int, int]] = None) -> Image.Image:
+    """
+    Returns a private, drawable copy of the shared decoded background, resized to `size`
+    when given. Reduced sizes start from the closest stored 1/2, 1/4 or 1/8 derivative,
+    so a preview never decodes or touches the full-resolution pixels once it exists.
+    """
+    factor = 1
+    if size is not None:
+        with Image.open(path) as header:  # Reads the header only.
+            full_size = header.size
+        if size == full_size:
+            size = None
+        else:
+            factor = reduction_factor(full_size, size)
+
+    if factor == 1:
+        shared = background_store.get(path)
+    else:
+        shared = background_store.get(path, variant=f"reduced-{factor}", decode=partial(_decode_reduced, factor=factor))
+    if size is not None and shared.size != size:
+        shared = shared.resize(size, Image.LANCZOS)
+    return shared.convert("RGBA" if shared.mode == "RGBA" else "RGB")
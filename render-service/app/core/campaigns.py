@@ -0,0 +1,244 @@
+import codecs
+import csv
+import json
+import logging
+import os
+import time
+import uuid
+import zipfile
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+from celery import chord
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image
+
+from app.core.celery_client import RENDER_QUEUE, celery_app
+from app.core.render import STATIC_OUTPUTS_PATH
+from app.schemas.render import TemplateServiceResponse
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_REDIS_URL = os.getenv("CAMPAIGN_REDIS_URL", os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0"))
+CAMPAIGN_CHUNK_SIZE = int(os.getenv("CAMPAIGN_CHUNK_SIZE", "500"))
+CAMPAIGN_MAX_ROWS = int(os.getenv("CAMPAIGN_MAX_ROWS", "100000"))
+CAMPAIGN_TTL_SECONDS = int(os.getenv("CAMPAIGN_TTL_SECONDS", str(7 * 24 * 3600)))
+OUTPUT_FORMATS = ("zip", "pdf")
+STREAM_CHUNK_SIZE = 256 * 1024
+
+redis_client = aioredis.Redis.from_url(CAMPAIGN_REDIS_URL, decode_responses=True)
+
+
+def campaign_output_dir(campaign_id: str) -> str:
+    return os.path.join(STATIC_OUTPUTS_PATH, "campaigns", campaign_id)
+
+
+def parse_rows(upload: IO[bytes], filename: str, columns: List[Optional[str]]) -> List[List[Optional[str]]]:
+    """
+    Reads a CSV (with a header row) or NDJSON upload and maps each record onto the
+    template's text blocks: `columns[i]` names the field for block i, or None to keep
+    the block's default text.
+    """
+    text = codecs.getreader("utf-8-sig")(upload)
+    is_ndjson = filename.lower().endswith((".ndjson", ".jsonl"))
+    if is_ndjson:
+        records = (json.loads(line) for line in text if line.strip())
+    else:
+        records = csv.DictReader(text)
+        missing = [column for column in columns if column is not None and column not in (records.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Columns not found in CSV header: {', '.join(missing)}")
+
+    rows = []
+    for line_number, record in enumerate(records, start=1):
+        if len(rows) >= CAMPAIGN_MAX_ROWS:
+            raise ValueError(f"Campaign exceeds the maximum of {CAMPAIGN_MAX_ROWS} rows")
+        if not isinstance(record, dict):
+            raise ValueError(f"Record {line_number} is not a JSON object")
+        rows.append([None if column is None or record.get(column) is None else str(record[column]) for column in columns])
+    return rows
+
+
+async def start_campaign(template: TemplateServiceResponse, rows: List[List[Optional[str]]], output_format: str) -> str:
+    """
+    Splits the rows into chunks and fans them out as a Celery chord on render_queue.
+    The template is fetched once here and shipped with every chunk, so workers only
+    set up the template and background once per chunk, never per row.
+    """
+    campaign_id = str(uuid.uuid4())
+    template_payload = template.model_dump(mode="json")
+
+    header = []
+    for chunk_index, start in enumerate(range(0, len(rows), CAMPAIGN_CHUNK_SIZE)):
+        # Rows carry their global index so outputs and failures can be tied back to the upload.
+        chunk = [[start + offset, texts] for offset, texts in enumerate(rows[start:start + CAMPAIGN_CHUNK_SIZE])]
+        header.append(celery_app.signature(
+            "tasks.render_campaign_chunk",
+            args=(campaign_id, chunk_index, template_payload, chunk, output_format),
+            queue=RENDER_QUEUE,
+        ))
+    body = celery_app.signature("tasks.finalize_campaign", args=(campaign_id,), queue=RENDER_QUEUE)
+
+    key = f"campaign:{campaign_id}"
+    await redis_client.hset(key, mapping={
+        "status": "running",
+        "template_id": str(template.id),
+        "output_format": output_format,
+        "total_rows": len(rows),
+        "chunks": len(header),
+        "created_at": time.time(),
+    })
+    await redis_client.expire(key, CAMPAIGN_TTL_SECONDS)
+
+    # Publishing to the broker is blocking I/O, so it runs off the event loop.
+    result = await run_in_threadpool(chord(header), body)
+    await redis_client.hset(key, "result_id", result.id)
+    logger.info(f"Campaign {campaign_id}: {len(rows)} rows in {len(header)} chunks dispatched to {RENDER_QUEUE}")
+    return campaign_id
+
+
+async def get_progress(campaign_id: str) -> Dict:
+    """Aggregates the per-chunk counters written by the workers."""
+    campaign = await redis_client.hgetall(f"campaign:{campaign_id}")
+    if not campaign:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Campaign not found.")
+    progress = await redis_client.hgetall(f"campaign:{campaign_id}:progress")
+    failures = await redis_client.hgetall(f"campaign:{campaign_id}:failures")
+
+    rendered = sum(int(value) for field, value in progress.items() if field.startswith("rendered:"))
+    failed = sum(int(value) for field, value in progress.items() if field.startswith("failed:"))
+    total = int(campaign["total_rows"])
+
+    campaign_status = campaign["status"]
+    if campaign_status == "running" and campaign.get("result_id"):
+        # A chunk that exhausted its own retries fails the chord, so the callback never runs.
+        state = await run_in_threadpool(lambda: celery_app.AsyncResult(campaign["result_id"]).state)
+        if state == "FAILURE":
+            campaign_status = "failed"
+
+    return {
+        "campaign_id": campaign_id,
+        "status": campaign_status,
+        "output_format": campaign["output_format"],
+        "total_rows": total,
+        "rendered_rows": rendered,
+        "failed_rows": failed,
+        "progress": (rendered + failed) / total if total else 1.0,
+        "failures": [{"row": int(row), "error": error} for row, error in sorted(failures.items(), key=lambda item: int(item[0]))],
+    }
+
+
+def _row_files(campaign_id: str, extension: str) -> List[str]:
+    output_dir = campaign_output_dir(campaign_id)
+    return sorted(
+        os.path.join(output_dir, name) for name in os.listdir(output_dir) if name.endswith(extension)
+    )
+
+
+class _StreamBuffer:
+    """Write-only, unseekable sink that lets zipfile emit data as it goes."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_zip(campaign_id: str) -> Iterator[bytes]:
+    """Streams the rendered rows as a ZIP built on the fly; nothing is assembled on disk."""
+    buffer = _StreamBuffer()
+    # PNGs are already compressed, so entries are stored rather than deflated again.
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for path in _row_files(campaign_id, ".png"):
+            with open(path, "rb") as source, archive.open(os.path.basename(path), mode="w", force_zip64=True) as entry:
+                while True:
+                    block = source.read(STREAM_CHUNK_SIZE)
+                    if not block:
+                        break
+                    entry.write(block)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            data = buffer.drain()
+            if data:
+                yield data
+    yield buffer.drain()
+
+
+def _jpeg_size(path: str) -> Tuple[int, int]:
+    with Image.open(path) as image:  # Reads the header only.
+        return image.size
+
+
+def stream_pdf(campaign_id: str) -> Iterator[bytes]:
+    """
+    Streams a multi-page PDF with one rendered row per page. Each page embeds the
+    worker's JPEG unchanged (DCTDecode), so pages are never decoded or re-encoded here
+    and memory stays flat regardless of the number of rows.
+    """
+    pages = _row_files(campaign_id, ".jpg")
+    offsets = []
+    position = 0
+
+    def emit(data: bytes) -> bytes:
+        nonlocal position
+        position += len(data)
+        return data
+
+    def begin_object() -> None:
+        offsets.append(position)
+
+    yield emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    # Objects: 1 catalog, 2 page tree, then (page, image, content) for every page.
+    page_ids = [3 + 3 * index for index in range(len(pages))]
+    begin_object()
+    yield emit(b"1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
+    begin_object()
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    yield emit(f"2 0 obj\n<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>\nendobj\n".encode("ascii"))
+
+    for page_id, path in zip(page_ids, pages):
+        width, height = _jpeg_size(path)
+        # 96 dpi: one pixel is 0.75 pt.
+        page_width, page_height = width * 0.75, height * 0.75
+        image_id, content_id = page_id + 1, page_id + 2
+        content = f"q {page_width:.2f} 0 0 {page_height:.2f} 0 0 cm /Im0 Do Q".encode("ascii")
+
+        begin_object()
+        yield emit((
+            f"{page_id} 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width:.2f} {page_height:.2f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>\nendobj\n"
+        ).encode("ascii"))
+
+        begin_object()
+        yield emit((
+            f"{image_id} 0 obj\n<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode /Length {os.path.getsize(path)} >>\nstream\n"
+        ).encode("ascii"))
+        with open(path, "rb") as source:
+            while True:
+                block = source.read(STREAM_CHUNK_SIZE)
+                if not block:
+                    break
+                yield emit(block)
+        yield emit(b"\nendstream\nendobj\n")
+
+        begin_object()
+        yield emit(f"{content_id} 0 obj\n<< /Length {len(content)} >>\nstream\n".encode("ascii") + content + b"\nendstream\nendobj\n")
+
+    xref_offset = position
+    xref = [f"xref\n0 {len(offsets) + 1}\n", "0000000000 65535 f \n"]
+    xref.extend(f"{offset:010d} 00000 n \n" for offset in offsets)
+    xref.append(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+    yield emit("".join(xref).encode("ascii"))
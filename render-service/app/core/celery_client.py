@@ -0,0 +1,12 @@
+import os
+
+from celery import Celery
+
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
+RENDER_QUEUE = "render_queue"
+
+# Producer-only Celery app. The tasks themselves live in worker-service and are
+# addressed by name, so render-service never imports worker code.
+celery_app = Celery("render_service", broker=CELERY_BROKER_URL, backend=CELERY_RESULT_BACKEND)
+celery_app.conf.task_routes = {"tasks.*": {"queue": RENDER_QUEUE}}
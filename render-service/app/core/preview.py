@@ -0,0 +1,290 @@
+import asyncio
+import io
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import WebSocket
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageDraw
+
+from app.core.assets import load_background
+from app.core.render import RenderingCore
+from common.text_render import block_layout, block_texts
+
+logger = logging.getLogger(__name__)
+
+# Edits are applied once typing pauses for PREVIEW_DEBOUNCE_MS, but never later than
+# PREVIEW_MAX_DELAY_MS after the first pending edit, so continuous typing still updates.
+PREVIEW_DEBOUNCE_MS = float(os.getenv("PREVIEW_DEBOUNCE_MS", "20"))
+PREVIEW_MAX_DELAY_MS = float(os.getenv("PREVIEW_MAX_DELAY_MS", "80"))
+PREVIEW_DEFAULT_WIDTH = int(os.getenv("PREVIEW_DEFAULT_WIDTH", "1280"))
+PREVIEW_FRAME_QUALITY = int(os.getenv("PREVIEW_FRAME_QUALITY", "60"))
+# Dirty regions larger than this fraction of the frame are sent as a full low-quality frame.
+PREVIEW_PATCH_MAX_AREA = float(os.getenv("PREVIEW_PATCH_MAX_AREA", "0.35"))
+# Each session holds a decoded background in memory, so sessions are capped per instance
+# and closed once the client has sent nothing for PREVIEW_IDLE_TIMEOUT_SECONDS.
+PREVIEW_MAX_SESSIONS = int(os.getenv("PREVIEW_MAX_SESSIONS", "100"))
+PREVIEW_IDLE_TIMEOUT_SECONDS = float(os.getenv("PREVIEW_IDLE_TIMEOUT_SECONDS", "300"))
+PREVIEW_MAX_TEXT_LENGTH = 2000
+# Antialiased glyph edges can bleed a pixel past the measured text box.
+DIRTY_PADDING = 2
+
+Box = Tuple[int, int, int, int]
+
+
+class PreviewIdleTimeout(Exception):
+    """Raised when a client has sent no message for PREVIEW_IDLE_TIMEOUT_SECONDS."""
+
+
+def _union(first: Optional[Box], second: Optional[Box]) -> Optional[Box]:
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return min(first[0], second[0]), min(first[1], second[1]), max(first[2], second[2]), max(first[3], second[3])
+
+
+def _intersects(first: Box, second: Box) -> bool:
+    return first[0] < second[2] and second[0] < first[2] and first[1] < second[3] and second[1] < first[3]
+
+
+class PreviewSession:
+    """
+    Resident state of one live preview: the template, its decoded background, the block
+    fonts and the current frame. Text edits only re-rasterise the region they touch.
+    Not thread-safe; a connection applies its edits one batch at a time.
+    """
+
+    def __init__(self, core: RenderingCore):
+        self.template = core.template
+        full_size, size = core.background_size(), core.output_size()
+        self.scale = size[0] / full_size[0]
+        self.base = load_background(core.background_path(), size if size != full_size else None)
+        self.frame = self.base.copy()
+        self.revision = 0
+
+        self.blocks = [block_layout(block, self.scale) for block in self.template.text_blocks]
+        self.texts = block_texts(self.template.text_blocks, [], fill_defaults=True)
+        self._measure = ImageDraw.Draw(Image.new("L", (1, 1)))
+        self.boxes = [self._text_box(index, text) for index, text in enumerate(self.texts)]
+
+        draw = ImageDraw.Draw(self.frame)
+        for index in range(len(self.blocks)):
+            self._draw_block(draw, index, (0, 0))
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.frame.size
+
+    def _text_box(self, index: int, text: str) -> Optional[Box]:
+        position, font, _ = self.blocks[index]
+        box = self._measure.textbbox(position, text, font=font)
+        if box[2] <= box[0] or box[3] <= box[1]:
+            return None
+        return box[0] - DIRTY_PADDING, box[1] - DIRTY_PADDING, box[2] + DIRTY_PADDING, box[3] + DIRTY_PADDING
+
+    def _draw_block(self, draw: ImageDraw.ImageDraw, index: int, origin: Tuple[int, int]):
+        (x, y), font, color = self.blocks[index]
+        if self.texts[index]:
+            draw.text((x - origin[0], y - origin[1]), self.texts[index], fill=color, font=font)
+
+    def apply(self, edits: Dict[int, str]) -> Optional[Tuple[Box, Image.Image]]:
+        """
+        Applies text edits and redraws only the union of the old and new text boxes:
+        that region is restored from the clean background, then every block overlapping it
+        is drawn again in order. Returns the patched region and its pixels, or None.
+        """
+        dirty = None
+        for index, text in edits.items():
+            if self.texts[index] == text:
+                continue
+            new_box = self._text_box(index, text)
+            dirty = _union(dirty, _union(self.boxes[index], new_box))
+            self.texts[index], self.boxes[index] = text, new_box
+        if dirty is None:
+            return None
+
+        width, height = self.frame.size
+        dirty = (max(0, dirty[0]), max(0, dirty[1]), min(width, dirty[2]), min(height, dirty[3]))
+        if dirty[2] <= dirty[0] or dirty[3] <= dirty[1]:
+            return None
+
+        tile = self.base.crop(dirty)
+        draw = ImageDraw.Draw(tile)
+        for index, box in enumerate(self.boxes):
+            if box is not None and _intersects(box, dirty):
+                self._draw_block(draw, index, dirty[:2])
+        self.frame.paste(tile, dirty[:2])
+        self.revision += 1
+        return dirty, tile
+
+    def encode_frame(self) -> Tuple[dict, bytes]:
+        """The whole current frame as a low-quality JPEG."""
+        buffer = io.BytesIO()
+        frame = self.frame.convert("RGB") if self.frame.mode != "RGB" else self.frame
+        frame.save(buffer, format="JPEG", quality=PREVIEW_FRAME_QUALITY)
+        header = {"type": "frame", "revision": self.revision, "format": "jpeg",
+                  "width": self.frame.width, "height": self.frame.height}
+        return header, buffer.getvalue()
+
+    def encode_update(self, dirty: Box, tile: Image.Image) -> Tuple[dict, bytes]:
+        """A lossless PNG of the patched region, or a full frame when the region is large."""
+        if tile.width * tile.height > PREVIEW_PATCH_MAX_AREA * self.frame.width * self.frame.height:
+            return self.encode_frame()
+        buffer = io.BytesIO()
+        tile.save(buffer, format="PNG", compress_level=1)
+        header = {"type": "patch", "revision": self.revision, "format": "png",
+                  "x": dirty[0], "y": dirty[1], "width": tile.width, "height": tile.height}
+        return header, buffer.getvalue()
+
+    def apply_and_encode(self, edits: Dict[int, str]) -> Optional[Tuple[dict, bytes]]:
+        update = self.apply(edits)
+        if update is None:
+            return None
+        return self.encode_update(*update)
+
+
+def parse_edits(message, block_count: int) -> Dict[int, str]:
+    """
+    Accepts `{"block": 0, "text": "..."}` for one block or
+    `{"blocks": {"0": "...", "2": "..."}}` for several.
+    """
+    if not isinstance(message, dict):
+        raise ValueError("Messages must be JSON objects")
+    if "blocks" in message:
+        raw = message["blocks"]
+        if not isinstance(raw, dict):
+            raise ValueError("'blocks' must map block indexes to text")
+        items = list(raw.items())
+    elif "block" in message:
+        items = [(message["block"], message.get("text"))]
+    else:
+        raise ValueError("Expected 'block' and 'text', or 'blocks'")
+
+    edits = {}
+    for raw_index, text in items:
+        try:
+            index = int(raw_index)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid block index: {raw_index}")
+        if not 0 <= index < block_count:
+            raise ValueError(f"Template has no text block {index}")
+        if not isinstance(text, str) or len(text) > PREVIEW_MAX_TEXT_LENGTH:
+            raise ValueError(f"Text for block {index} must be a string of at most {PREVIEW_MAX_TEXT_LENGTH} characters")
+        edits[index] = text
+    return edits
+
+
+class PreviewMetrics:
+    def __init__(self):
+        self.active_sessions = 0
+        self.rejected_sessions = 0
+        self.patches_sent = 0
+        self.frames_sent = 0
+
+    def prometheus_metrics(self) -> str:
+        lines = [
+            "# HELP render_preview_sessions Open live-preview WebSocket sessions.",
+            "# TYPE render_preview_sessions gauge",
+            f"render_preview_sessions {self.active_sessions}",
+            "# HELP render_preview_sessions_rejected_total Live-preview sessions refused at PREVIEW_MAX_SESSIONS.",
+            "# TYPE render_preview_sessions_rejected_total counter",
+            f"render_preview_sessions_rejected_total {self.rejected_sessions}",
+            "# HELP render_preview_updates_total Live-preview updates sent, by kind.",
+            "# TYPE render_preview_updates_total counter",
+            f'render_preview_updates_total{{kind="patch"}} {self.patches_sent}',
+            f'render_preview_updates_total{{kind="frame"}} {self.frames_sent}',
+        ]
+        return "\n".join(lines) + "\n"
+
+
+preview_metrics = PreviewMetrics()
+
+
+class PreviewSender:
+    """
+    The only writer to a preview WebSocket. The receive and render tasks both send, and
+    an update is two messages (JSON header, then the image bytes), so every send holds
+    one lock; an error reply can never land between a header and its bytes.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self._lock = asyncio.Lock()
+
+    async def send_json(self, message: dict):
+        async with self._lock:
+            await self.websocket.send_json(message)
+
+    async def send_update(self, update: Tuple[dict, bytes]):
+        """Each update is a JSON header message followed by one binary message with the image."""
+        header, data = update
+        async with self._lock:
+            await self.websocket.send_json(header)
+            await self.websocket.send_bytes(data)
+        if header["type"] == "patch":
+            preview_metrics.patches_sent += 1
+        else:
+            preview_metrics.frames_sent += 1
+
+    async def close(self, code: int):
+        async with self._lock:
+            await self.websocket.close(code=code)
+
+
+async def run_session(sender: PreviewSender, session: PreviewSession):
+    """
+    Receives edits and renders them until the client disconnects, or raises
+    PreviewIdleTimeout once it stops sending. Edits that arrive while waiting or
+    rendering are coalesced (the latest text per block wins), so a burst of keystrokes
+    costs one render instead of one per key.
+    """
+    loop = asyncio.get_running_loop()
+    pending: Dict[int, str] = {}
+    edited = asyncio.Event()
+    last_edit = 0.0
+
+    async def receive():
+        nonlocal last_edit
+        while True:
+            try:
+                message = await asyncio.wait_for(sender.websocket.receive_text(), PREVIEW_IDLE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                raise PreviewIdleTimeout(f"No message for {PREVIEW_IDLE_TIMEOUT_SECONDS:g}s")
+            try:
+                edits = parse_edits(json.loads(message), len(session.blocks))
+            except ValueError as e:  # Includes malformed JSON.
+                await sender.send_json({"type": "error", "detail": str(e)})
+                continue
+            pending.update(edits)
+            last_edit = loop.time()
+            edited.set()
+
+    async def render():
+        while True:
+            await edited.wait()
+            first_edit = loop.time()
+            while True:
+                now = loop.time()
+                delay = min(last_edit + PREVIEW_DEBOUNCE_MS / 1000 - now, first_edit + PREVIEW_MAX_DELAY_MS / 1000 - now)
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            edits = dict(pending)
+            pending.clear()
+            edited.clear()
+            update = await run_in_threadpool(session.apply_and_encode, edits)
+            if update is not None:
+                await sender.send_update(update)
+
+    tasks: List[asyncio.Task] = [asyncio.create_task(receive()), asyncio.create_task(render())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()  # Re-raises the disconnect, idle timeout or a render error to the caller.
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
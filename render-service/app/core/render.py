@@ -1,85 +1,48 @@
 import os
-import requests
 import uuid
 import logging
+from typing import Tuple
 from fastapi import HTTPException, status
-from PIL import Image, ImageDraw, ImageFont
-from weasyprint import HTML
+from PIL import Image
 
 from app.schemas.render import TemplateServiceResponse, ImageRenderRequest
+from app.core.admission import estimate_cost
+from app.core.assets import STATIC_BACKGROUNDS_PATH, load_background
+from common.text_render import draw_blocks
 
 # Set up logging for this module
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Constants
-TEMPLATE_SERVICE_URL = os.getenv("TEMPLATE_SERVICE_URL")
-STATIC_BACKGROUNDS_PATH = "/app/static/backgrounds"
-STATIC_OUTPUTS_PATH = "/app/static/outputs"
-FONT_PATH = "/usr/share/fonts/dejavu/DejaVuSans.ttf" 
+STATIC_OUTPUTS_PATH = os.getenv("STATIC_OUTPUTS_PATH", "/app/static/outputs")
 
 class RenderingCore:
     """
-    Encapsulates all core rendering logic, including API calls, image manipulation,
-    and PDF generation, with comprehensive error handling and logging.
+    Encapsulates all core rendering logic, including image manipulation and PDF
+    generation, with comprehensive error handling and logging. Template metadata is
+    fetched beforehand by app.core.templates.fetch_template.
     """
 
-    def __init__(self, request: ImageRenderRequest):
+    def __init__(self, request: ImageRenderRequest, template: TemplateServiceResponse):
         self.request = request
-        self.template = self._fetch_template()
+        self.template = template
+        self._background_size = None
 
-    def _fetch_template(self) -> TemplateServiceResponse:
-        """Fetches template metadata from the template-service."""
-        logger.info(f"Fetching template metadata for ID: {self.request.template_id}")
-        if not TEMPLATE_SERVICE_URL:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="TEMPLATE_SERVICE_URL is not configured."
-            )
-        try:
-            template_url = f"{TEMPLATE_SERVICE_URL}/api/v1/templates/{self.request.template_id}"
-            response = requests.get(template_url)
-            response.raise_for_status()
-            template_data = response.json()
-            return TemplateServiceResponse(**template_data)
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to fetch template from template-service: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to fetch template metadata: {e}"
-            )
-        except Exception as e:
-            logger.error(f"Invalid template data received: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Invalid template data received: {e}"
-            )
+    def _render_text_on_image(self, image: Image.Image, scale: float = 1.0) -> Image.Image:
+        """Draws user text onto a provided PIL image, with block geometry scaled by `scale`."""
+        if len(self.request.text_data) > len(self.template.text_blocks):
+            logger.warning(f"Too much text data provided for template {self.template.id}. Ignoring extra.")
+        texts = [block_request.user_text for block_request in self.request.text_data]
+        return draw_blocks(image, self.template.text_blocks, texts, scale)
 
-    def _render_text_on_image(self, image: Image.Image) -> Image.Image:
-        """Draws user text onto a provided PIL image."""
-        draw = ImageDraw.Draw(image)
-        for i, block_request in enumerate(self.request.text_data):
-            if i >= len(self.template.text_blocks):
-                logger.warning(f"Too much text data provided for template {self.template.id}. Ignoring extra.")
-                break
-            template_block = self.template.text_blocks[i]
-            try:
-                font = ImageFont.truetype(FONT_PATH, template_block.font_size)
-            except IOError:
-                logger.warning(f"Font not found at {FONT_PATH}. Using default font.")
-                font = ImageFont.load_default()
-            
-            draw.text(
-                (template_block.x, template_block.y),
-                block_request.user_text,
-                fill=template_block.color,
-                font=font
+    def background_path(self) -> str:
+        """Resolves the template's background image on the shared volume."""
+        if not self.template.image_path:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Template does not have a background image path."
             )
-        return image
-
-    def generate_image(self) -> str:
-        """Generates a customized image and returns its saved path."""
-        logger.info(f"Starting image generation for template ID: {self.template.id}")
         background_path = os.path.join(STATIC_BACKGROUNDS_PATH, os.path.basename(self.template.image_path))
         if not os.path.exists(background_path):
             logger.error(f"Background image not found at {background_path}")
@@ -87,9 +50,42 @@ class RenderingCore:
                 status_code=status.HTTP_404_NOT_FOUND, 
                 detail=f"Background image not found at path: {background_path}"
             )
+        return background_path
+
+    def background_size(self) -> Tuple[int, int]:
+        """The background's full pixel size, read from the file header (no decode)."""
+        if self._background_size is None:
+            with Image.open(self.background_path()) as background:
+                self._background_size = background.size
+        return self._background_size
+
+    def output_size(self) -> Tuple[int, int]:
+        """The size to render at: the background's, or smaller when the request asks for it."""
+        width, height = self.background_size()
+        if self.request.target_width is not None:
+            scale = self.request.target_width / width
+        elif self.request.scale is not None:
+            scale = self.request.scale
+        else:
+            return width, height
+        if scale >= 1:
+            return width, height
+        return max(1, round(width * scale)), max(1, round(height * scale))
+
+    def estimate_cost(self, output_format: str = "png") -> float:
+        """Estimates the render cost from the output's pixel size (header only, no decode)."""
+        width, height = self.output_size()
+        block_count = min(len(self.request.text_data), len(self.template.text_blocks))
+        return estimate_cost(width, height, block_count, output_format)
+
+    def generate_image(self) -> str:
+        """Generates a customized image and returns its saved path."""
+        logger.info(f"Starting image generation for template ID: {self.template.id}")
+        background_path = self.background_path()
         try:
-            image = Image.open(background_path)
-            image = self._render_text_on_image(image)
+            size, full_size = self.output_size(), self.background_size()
+            image = load_background(background_path, size if size != full_size else None)
+            image = self._render_text_on_image(image, size[0] / full_size[0])
             
             os.makedirs(STATIC_OUTPUTS_PATH, exist_ok=True)
             unique_filename = f"{uuid.uuid4()}.png"
@@ -115,6 +111,10 @@ class RenderingCore:
         logger.info(f"Starting PDF generation for template ID: {self.template.id}")
         image_path = self.generate_image()
         try:
+            # WeasyPrint pulls in Pango/Cairo, which is slow to import and only needed
+            # for PDFs, so it is loaded on first use rather than at module import.
+            from weasyprint import HTML
+
             image_url_for_html = f"file://{image_path}"
             html_content = f"""
             <!DOCTYPE html>
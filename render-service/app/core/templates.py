@@ -0,0 +1,77 @@
+import logging
+import os
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+
+from app.schemas.render import TemplateServiceResponse
+from common.http import CircuitBreaker, CircuitOpenError, ServiceClient, ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SERVICE_URL = os.getenv("TEMPLATE_SERVICE_URL")
+_hedge_delay = os.getenv("TEMPLATE_SERVICE_HEDGE_DELAY_SECONDS")
+
+# One pooled client per process; connections to template-service are reused across requests.
+template_client = ServiceClient(
+    name="template-service",
+    base_url=TEMPLATE_SERVICE_URL or "",
+    connect_timeout=float(os.getenv("TEMPLATE_SERVICE_CONNECT_TIMEOUT", "1.0")),
+    read_timeout=float(os.getenv("TEMPLATE_SERVICE_READ_TIMEOUT", "3.0")),
+    max_connections=int(os.getenv("TEMPLATE_SERVICE_MAX_CONNECTIONS", "50")),
+    retries=int(os.getenv("TEMPLATE_SERVICE_RETRIES", "2")),
+    hedge_delay=float(_hedge_delay) if _hedge_delay else None,
+    breaker=CircuitBreaker(
+        "template-service",
+        failure_threshold=int(os.getenv("TEMPLATE_SERVICE_BREAKER_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("TEMPLATE_SERVICE_BREAKER_RESET_SECONDS", "10")),
+    ),
+)
+
+
+async def fetch_template(template_id: UUID, authorization: Optional[str] = None) -> TemplateServiceResponse:
+    """Fetches template metadata from the template-service."""
+    logger.info(f"Fetching template metadata for ID: {template_id}")
+    if not TEMPLATE_SERVICE_URL:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="TEMPLATE_SERVICE_URL is not configured."
+        )
+
+    # Forward the caller's token so template-service can authorize the call locally.
+    headers = {"Authorization": authorization} if authorization else None
+    try:
+        response = await template_client.request("GET", f"/api/v1/templates/{template_id}", headers=headers)
+    except CircuitOpenError as e:
+        logger.error(f"Not calling template-service: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Template service is unavailable.",
+            headers={"Retry-After": str(max(1, int(e.retry_after)))},
+        )
+    except ServiceUnavailableError as e:
+        logger.error(f"Failed to fetch template from template-service: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to fetch template metadata: {e}"
+        )
+
+    if response.status_code == status.HTTP_404_NOT_FOUND:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template not found.")
+    if response.is_error:
+        logger.error(f"template-service returned {response.status_code} for template {template_id}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to fetch template metadata: template-service returned {response.status_code}"
+        )
+
+    try:
+        return TemplateServiceResponse(**response.json())
+    except (ValueError, ValidationError) as e:
+        logger.error(f"Invalid template data received: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Invalid template data received: {e}"
+        )
@@ -0,0 +1,53 @@
+import logging
+import os
+import time
+
+from app.core.assets import STATIC_BACKGROUNDS_PATH, background_store
+from common.text_render import get_font
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("RENDER_WARMUP", "false").lower() == "true"
+WARMUP_FONT_SIZES = [int(size) for size in os.getenv("RENDER_WARMUP_FONT_SIZES", "12,18,24,36,48,60,72").split(",") if size.strip()]
+# Comma separated background file names to preload. When unset, the most recently
+# uploaded RENDER_WARMUP_BACKGROUNDS files are preloaded instead.
+WARMUP_BACKGROUND_FILES = [name.strip() for name in os.getenv("RENDER_WARMUP_BACKGROUND_FILES", "").split(",") if name.strip()]
+WARMUP_BACKGROUNDS = int(os.getenv("RENDER_WARMUP_BACKGROUNDS", "10"))
+WARMUP_PDF = os.getenv("RENDER_WARMUP_PDF", "false").lower() == "true"
+
+
+def _backgrounds_to_preload():
+    if WARMUP_BACKGROUND_FILES:
+        return [os.path.join(STATIC_BACKGROUNDS_PATH, name) for name in WARMUP_BACKGROUND_FILES]
+    try:
+        entries = [entry for entry in os.scandir(STATIC_BACKGROUNDS_PATH) if entry.is_file()]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    return [entry.path for entry in entries[:WARMUP_BACKGROUNDS]]
+
+
+def warm_up():
+    """
+    Preloads fonts, hot backgrounds and (optionally) the WeasyPrint stack so the first
+    requests after a pod starts are as fast as later ones. Blocking; run off the event loop.
+    """
+    started = time.monotonic()
+    for size in WARMUP_FONT_SIZES:
+        get_font(size)
+
+    loaded = 0
+    for path in _backgrounds_to_preload():
+        try:
+            background_store.get(path)
+            loaded += 1
+        except (OSError, ValueError) as e:
+            logger.warning(f"Warm-up could not load background {path}: {e}")
+
+    if WARMUP_PDF:
+        import weasyprint  # noqa: F401  (pays the Pango/Cairo import cost up front)
+
+    logger.info(
+        f"Warm-up complete in {time.monotonic() - started:.2f}s: "
+        f"{len(WARMUP_FONT_SIZES)} font sizes, {loaded} backgrounds, pdf={WARMUP_PDF}"
+    )
@@ -1,14 +1,86 @@
 # app/main.py
-from fastapi import FastAPI
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from app.core.admission import admission_controller
+from app.core.preview import preview_metrics
+from app.core.render import STATIC_OUTPUTS_PATH
+from app.core.templates import template_client
+from app.core.warmup import WARMUP_ENABLED, warm_up
+from app.routers.campaigns import router as campaigns_router
+from app.routers.preview import router as preview_router
 from app.routers.render import router as render_router
+from common.auth import JWTAuthMiddleware
+from common.staticfiles import ImmutableStaticFiles
+
+logger = logging.getLogger(__name__)
+
+async def _warm_up_then_mark_ready(app: FastAPI):
+    try:
+        await run_in_threadpool(warm_up)
+    except Exception as e:
+        # A failed warm-up only costs latency on the first requests; still serve traffic.
+        logger.error(f"Warm-up failed: {e}")
+    app.state.ready = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm-up runs in the background so liveness answers immediately while readiness
+    # stays false until fonts and hot backgrounds are resident.
+    app.state.ready = not WARMUP_ENABLED
+    warmup_task = asyncio.create_task(_warm_up_then_mark_ready(app)) if WARMUP_ENABLED else None
+    yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await template_client.aclose()
 
 app = FastAPI(
     title="Render Service API",
-    description="A microservice for generating rendered documents and images from templates."
+    description="A microservice for generating rendered documents and images from templates.",
+    lifespan=lifespan
 )
 
+# Tokens issued by auth-service are verified locally, without a call back to auth-service.
+if os.getenv("AUTH_REQUIRED", "false").lower() == "true":
+    app.add_middleware(
+        JWTAuthMiddleware,
+        exempt_paths=["/", "/health", "/ready", "/metrics", "/static", "/docs", "/openapi.json"],
+    )
+
 app.include_router(render_router)
+app.include_router(campaigns_router)
+app.include_router(preview_router)
+
+# Rendered files are uuid-named and written once, so clients and CDNs may cache them forever.
+os.makedirs(STATIC_OUTPUTS_PATH, exist_ok=True)
+app.mount("/static/outputs", ImmutableStaticFiles(directory=STATIC_OUTPUTS_PATH), name="outputs")
 
 @app.get("/")
 def read_root():
-    return {"message": "Hello, World! Render Service is up and running."}
\ No newline at end of file
+    return {"message": "Hello, World! Render Service is up and running."}
+
+@app.get("/health", status_code=status.HTTP_200_OK)
+async def liveness():
+    """Liveness: the process is up and serving its event loop."""
+    return {"status": "ok", "service": "render-service"}
+
+@app.get("/ready")
+async def readiness(response: Response):
+    """Readiness: warm-up has finished and the instance can take traffic at full speed."""
+    if not getattr(app.state, "ready", False):
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "warming_up", "service": "render-service"}
+    return {"status": "ready", "service": "render-service"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Exposes admission control, template-service circuit breaker and live-preview metrics for Prometheus."""
+    return (
+        admission_controller.prometheus_metrics()
+        + template_client.prometheus_metrics()
+        + preview_metrics.prometheus_metrics()
+    )
\ No newline at end of file
@@ -0,0 +1,95 @@
+from fastapi import APIRouter, File, Form, Header, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from json import loads
+from typing import Annotated, Optional
+from uuid import UUID
+
+from app.core import campaigns
+from app.core.templates import fetch_template
+from app.schemas.render import CampaignCreatedResponse, CampaignProgressResponse
+
+router = APIRouter(prefix="/api/v1/campaigns", tags=["campaigns"])
+
+
+@router.post("", response_model=CampaignCreatedResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_campaign(
+    template_id: Annotated[UUID, Form()],
+    columns_json: Annotated[str, Form()],
+    rows_file: Annotated[UploadFile, File()],
+    output_format: Annotated[str, Form()] = "zip",
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Renders one template for every row of a CSV (with header) or NDJSON upload.
+    `columns_json` is a JSON list naming the column for each text block, in block order
+    (null keeps the block's default text). Rendering happens asynchronously on the
+    render_queue workers; poll the returned status URL for progress.
+    """
+    if output_format not in campaigns.OUTPUT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid output format. Choose one of: {', '.join(campaigns.OUTPUT_FORMATS)}."
+        )
+    try:
+        columns = loads(columns_json)
+        if not isinstance(columns, list) or not all(column is None or isinstance(column, str) for column in columns):
+            raise ValueError("columns_json must be a JSON list of column names or nulls")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Invalid column mapping: {e}")
+
+    template = await fetch_template(template_id, authorization)
+    if len(columns) > len(template.text_blocks):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Template has {len(template.text_blocks)} text blocks but {len(columns)} columns were mapped."
+        )
+    # Unmapped trailing blocks keep their default text.
+    columns = columns + [None] * (len(template.text_blocks) - len(columns))
+
+    try:
+        rows = await run_in_threadpool(campaigns.parse_rows, rows_file.file, rows_file.filename or "", columns)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Invalid rows file: {e}")
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The rows file contains no rows.")
+
+    campaign_id = await campaigns.start_campaign(template, rows, output_format)
+    return CampaignCreatedResponse(
+        campaign_id=campaign_id,
+        total_rows=len(rows),
+        status_url=f"/api/v1/campaigns/{campaign_id}",
+    )
+
+
+@router.get("/{campaign_id}", response_model=CampaignProgressResponse)
+async def get_campaign(campaign_id: UUID):
+    """
+    Reports aggregate progress across all chunks, including rows that failed after retries.
+    """
+    return await campaigns.get_progress(str(campaign_id))
+
+
+@router.get("/{campaign_id}/download")
+async def download_campaign(campaign_id: UUID):
+    """
+    Streams the finished campaign as a ZIP of PNGs or a single multi-page PDF.
+    """
+    progress = await campaigns.get_progress(str(campaign_id))
+    if progress["status"] != "complete":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Campaign is not complete yet (status: {progress['status']})."
+        )
+
+    if progress["output_format"] == "pdf":
+        return StreamingResponse(
+            campaigns.stream_pdf(str(campaign_id)),
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="campaign-{campaign_id}.pdf"'},
+        )
+    return StreamingResponse(
+        campaigns.stream_zip(str(campaign_id)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="campaign-{campaign_id}.zip"'},
+    )
@@ -0,0 +1,114 @@
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image
+from pydantic import ValidationError
+from typing import Optional
+from uuid import UUID
+import logging
+
+from app.core.admission import admission_controller
+from app.core.preview import (
+    PREVIEW_DEFAULT_WIDTH,
+    PREVIEW_MAX_SESSIONS,
+    PreviewIdleTimeout,
+    PreviewSender,
+    PreviewSession,
+    preview_metrics,
+    run_session,
+)
+from app.core.render import RenderingCore
+from app.core.templates import fetch_template
+from app.schemas.render import ImageRenderRequest
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1", tags=["preview"])
+
+
+@router.websocket("/preview/{template_id}")
+async def live_preview(
+    websocket: WebSocket,
+    template_id: UUID,
+    target_width: Optional[int] = None,
+    scale: Optional[float] = None,
+):
+    """
+    Live preview of one template for an editor. The server first sends
+    `{"type": "ready", ...}` and a full frame. The client then sends text edits,
+    `{"block": 0, "text": "..."}` or `{"blocks": {"0": "...", "1": "..."}}`. Each
+    update comes back as a JSON header (`type` "patch" with x/y/width/height, or
+    "frame") followed by a binary message with the PNG patch or JPEG frame.
+    Errors that end the session are sent as `{"type": "error", "status": ...}` and
+    close the socket with code 4000 + status.
+    """
+    await websocket.accept()
+    sender = PreviewSender(websocket)
+    if preview_metrics.active_sessions >= PREVIEW_MAX_SESSIONS:
+        preview_metrics.rejected_sessions += 1
+        await sender.send_json({"type": "error", "status": status.HTTP_503_SERVICE_UNAVAILABLE,
+                                "detail": "Too many live preview sessions on this instance. Retry shortly."})
+        await sender.close(4000 + status.HTTP_503_SERVICE_UNAVAILABLE)
+        return
+    # Counted from here, so sessions that are still loading their template take a slot too.
+    preview_metrics.active_sessions += 1
+    try:
+        await _serve(sender, template_id, target_width, scale)
+    finally:
+        preview_metrics.active_sessions -= 1
+
+
+async def _serve(sender: PreviewSender, template_id: UUID, target_width: Optional[int], scale: Optional[float]):
+    websocket = sender.websocket
+    authorization = websocket.headers.get("authorization")
+    if authorization is None and websocket.query_params.get("access_token"):
+        authorization = f"Bearer {websocket.query_params['access_token']}"
+
+    try:
+        request = ImageRenderRequest(
+            template_id=template_id,
+            text_data=[],
+            target_width=target_width if target_width is not None or scale is not None else PREVIEW_DEFAULT_WIDTH,
+            scale=scale,
+        )
+        template = await fetch_template(template_id, authorization)
+        core = RenderingCore(request, template)
+        cost = await run_in_threadpool(core.estimate_cost, "png")
+        # Only opening a session decodes and draws a whole frame; later edits touch small regions.
+        async with admission_controller.admit(cost):
+            session = await run_in_threadpool(PreviewSession, core)
+            frame = await run_in_threadpool(session.encode_frame)
+    except ValidationError as e:
+        await sender.send_json({"type": "error", "status": status.HTTP_422_UNPROCESSABLE_ENTITY, "detail": "; ".join(error["msg"] for error in e.errors())})
+        await sender.close(4000 + status.HTTP_422_UNPROCESSABLE_ENTITY)
+        return
+    except HTTPException as e:
+        # Close codes 4000-4999 are application defined; 4000 + HTTP status keeps them readable.
+        await sender.send_json({"type": "error", "status": e.status_code, "detail": e.detail})
+        await sender.close(4000 + e.status_code)
+        return
+    except (OSError, Image.DecompressionBombError) as e:  # Includes unreadable backgrounds.
+        logger.error(f"Live preview for template {template_id} could not load its background: {e}")
+        await sender.send_json({"type": "error", "status": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                                "detail": "Failed to load the template background."})
+        await sender.close(4000 + status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return
+
+    try:
+        width, height = session.size
+        await sender.send_json({
+            "type": "ready",
+            "template_id": str(template_id),
+            "width": width,
+            "height": height,
+            "blocks": session.texts,
+        })
+        await sender.send_update(frame)
+        await run_session(sender, session)
+    except WebSocketDisconnect:
+        pass
+    except PreviewIdleTimeout as e:
+        await sender.send_json({"type": "error", "status": status.HTTP_408_REQUEST_TIMEOUT, "detail": str(e)})
+        await sender.close(4000 + status.HTTP_408_REQUEST_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Live preview for template {template_id} failed: {e}")
+        await sender.close(1011)
@@ -1,84 +1,43 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import ValidationError
-from typing import Dict, Any
-from PIL import Image, ImageDraw, ImageFont
-import requests
-import uuid
+from fastapi import APIRouter, Header
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
 import os
 
-from app.schemas.render import ImageRenderRequest, ImageRenderResponse, TemplateServiceResponse
+from app.core.admission import admission_controller
+from app.core.render import RenderingCore
+from app.core.templates import fetch_template
+from app.schemas.render import ImageRenderRequest, ImageRenderResponse, PdfRenderResponse
 
 router = APIRouter(prefix="/api/v1", tags=["render"])
 
-# Constants
-TEMPLATE_SERVICE_URL = os.getenv("TEMPLATE_SERVICE_URL")
-STATIC_OUTPUTS_PATH = "/app/static/outputs"
-STATIC_BACKGROUNDS_PATH = "/app/static/backgrounds"
-FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf" # A standard font in many Linux distros
 
 @router.post("/generate-image", response_model=ImageRenderResponse)
-async def generate_image(request: ImageRenderRequest):
+async def generate_image(request: ImageRenderRequest, authorization: Optional[str] = Header(None)):
     """
     Generates a custom image from a template with user-provided text.
     """
-    # 1. Make internal HTTP request to template-service
-    if not TEMPLATE_SERVICE_URL:
-        raise HTTPException(status_code=500, detail="TEMPLATE_SERVICE_URL is not configured.")
+    template = await fetch_template(request.template_id, authorization)
+    core = RenderingCore(request, template)
+    cost = await run_in_threadpool(core.estimate_cost, "png")
 
-    try:
-        response = requests.get(f"{TEMPLATE_SERVICE_URL}/templates/{request.template_id}")
-        response.raise_for_status()
-        template_data = response.json()
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch template metadata: {e}")
+    # Rendering is CPU and memory bound, so it only starts once admission control has
+    # reserved capacity for it; otherwise the request is shed with a 429.
+    async with admission_controller.admit(cost):
+        output_path = await run_in_threadpool(core.generate_image)
 
-    # 2. Validate received template data
-    try:
-        template = TemplateServiceResponse(**template_data)
-    except ValidationError:
-        raise HTTPException(status_code=500, detail="Invalid template data received from template-service.")
-    
-    # Check if a background image path exists
-    if not template.image_path:
-        raise HTTPException(status_code=404, detail="Template does not have a background image path.")
+    return ImageRenderResponse(image_url=f"/static/outputs/{os.path.basename(output_path)}")
 
-    # 3. Load background image from static/backgrounds
-    background_path = os.path.join(STATIC_BACKGROUNDS_PATH, os.path.basename(template.image_path))
-    if not os.path.exists(background_path):
-        raise HTTPException(status_code=404, detail=f"Background image not found at {background_path}.")
 
-    try:
-        image = Image.open(background_path)
-    except IOError:
-        raise HTTPException(status_code=500, detail="Failed to load background image.")
-    
-    draw = ImageDraw.Draw(image)
-
-    # 4. Iterate and draw text onto the image
-    for block_data in request.text_data:
-        try:
-            font = ImageFont.truetype(FONT_PATH, block_data.font_size)
-        except IOError:
-            # Fallback to a default font if specified font is not found
-            font = ImageFont.load_default()
-
-        draw.text(
-            (block_data.x, block_data.y),
-            block_data.user_text,
-            fill=block_data.color,
-            font=font
-        )
-    
-    # Ensure output directory exists
-    os.makedirs(STATIC_OUTPUTS_PATH, exist_ok=True)
+@router.post("/generate-pdf", response_model=PdfRenderResponse)
+async def generate_pdf(request: ImageRenderRequest, authorization: Optional[str] = Header(None)):
+    """
+    Generates a custom PDF from a template with user-provided text.
+    """
+    template = await fetch_template(request.template_id, authorization)
+    core = RenderingCore(request, template)
+    cost = await run_in_threadpool(core.estimate_cost, "pdf")
 
-    # 5. Save the generated image with a unique filename
-    unique_filename = f"{uuid.uuid4()}.png"
-    output_path = os.path.join(STATIC_OUTPUTS_PATH, unique_filename)
-    try:
-        image.save(output_path)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save generated image: {e}")
+    async with admission_controller.admit(cost):
+        output_path = await run_in_threadpool(core.generate_pdf)
 
-    # 6. Return URL of the generated image
-    return ImageRenderResponse(image_url=f"/static/outputs/{unique_filename}")
\ No newline at end of file
+    return PdfRenderResponse(pdf_url=f"/static/outputs/{os.path.basename(output_path)}")
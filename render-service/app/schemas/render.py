@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import List, Optional
 from uuid import UUID
 
 class TextBlockRequest(BaseModel):
@@ -10,11 +10,25 @@ class ImageRenderRequest(BaseModel):
     """The complete payload for the image rendering request."""
     template_id: UUID
     text_data: List[TextBlockRequest]
+    # Optional reduced output size, e.g. for previews: an output width in pixels, or a
+    # scale factor of the background. Output is never larger than the background.
+    target_width: Optional[int] = Field(None, gt=0, le=16384)
+    scale: Optional[float] = Field(None, gt=0, le=1)
+
+    @model_validator(mode="after")
+    def check_single_size_option(self):
+        if self.target_width is not None and self.scale is not None:
+            raise ValueError("Provide either target_width or scale, not both")
+        return self
 
 class ImageRenderResponse(BaseModel):
     """Schema for the successful response after an image is generated."""
     image_url: str
 
+class PdfRenderResponse(BaseModel):
+    """Schema for the successful response after a PDF is generated."""
+    pdf_url: str
+
 # Schema for the response from the template-service (remains the same)
 class TemplateServiceTextBlock(BaseModel):
     x: int
@@ -26,6 +40,30 @@ class TemplateServiceTextBlock(BaseModel):
     default_text: str
 
 class TemplateServiceResponse(BaseModel):
-    id: UUID
+    # template-service serializes the document id as Mongo's `_id`.
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: UUID = Field(alias="_id")
     image_path: str
-    text_blocks: List[TemplateServiceTextBlock]
\ No newline at end of file
+    text_blocks: List[TemplateServiceTextBlock]
+
+class CampaignCreatedResponse(BaseModel):
+    """Schema returned when a bulk campaign has been accepted and dispatched."""
+    campaign_id: UUID
+    total_rows: int
+    status_url: str
+
+class CampaignRowFailure(BaseModel):
+    row: int
+    error: str
+
+class CampaignProgressResponse(BaseModel):
+    """Aggregate progress of a bulk campaign across all of its chunks."""
+    campaign_id: UUID
+    status: str
+    output_format: str
+    total_rows: int
+    rendered_rows: int
+    failed_rows: int
+    progress: float
+    failures: List[CampaignRowFailure]
\ No newline at end of file
@@ -0,0 +1,124 @@
+# render-service/benchmarks/cold_start.py
+"""
+Cold-start benchmark for render-service.
+
+Measures, each in a fresh interpreter:
+  * import latency of `app.main` (what a new pod pays before it can listen),
+  * import latency of WeasyPrint (now deferred until the first PDF),
+  * latency of the first and second image render, with and without warm-up.
+
+No template-service is needed: a synthetic background and template are generated
+in a temporary directory, and the shared background store is emptied before each run.
+
+Usage, from the render-service directory:
+
+    python -m benchmarks.cold_start --runs 5
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SERVICE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+REPO_ROOT = os.path.abspath(os.path.join(SERVICE_DIR, ".."))
+
+IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+"""
+
+FIRST_RENDER_SNIPPET = """
+import json, time, uuid
+from PIL import Image
+from app.schemas.render import ImageRenderRequest, TemplateServiceResponse
+from app.core.render import RenderingCore
+from app.core import warmup
+
+if {warm}:
+    warmup.warm_up()
+
+template = TemplateServiceResponse(
+    id=uuid.uuid4(),
+    image_path="/static/backgrounds/background.jpg",
+    text_blocks=[
+        dict(x=50, y=50, width=800, height=100, font_size=48, color="#FFFFFF", default_text="Title"),
+        dict(x=50, y=160, width=800, height=50, font_size=24, color="#CCCCCC", default_text="Subtitle"),
+    ],
+)
+request = ImageRenderRequest(
+    template_id=template.id,
+    text_data=[{{"user_text": "Hello"}}, {{"user_text": "World"}}],
+)
+timings = []
+for _ in range(2):
+    started = time.perf_counter()
+    RenderingCore(request, template).generate_image()
+    timings.append(time.perf_counter() - started)
+print(json.dumps(timings))
+"""
+
+
+def _run(snippet: str, env: dict) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=SERVICE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def main(runs: int):
+    with tempfile.TemporaryDirectory() as workdir:
+        backgrounds = os.path.join(workdir, "backgrounds")
+        outputs = os.path.join(workdir, "outputs")
+        os.makedirs(backgrounds)
+        from PIL import Image
+        Image.new("RGB", (3000, 2000), "#336699").save(os.path.join(backgrounds, "background.jpg"), quality=90)
+
+        env = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join([SERVICE_DIR, REPO_ROOT]),
+            STATIC_BACKGROUNDS_PATH=backgrounds,
+            STATIC_OUTPUTS_PATH=outputs,
+            TEMPLATE_SERVICE_URL="http://template-service.invalid",
+            RENDER_WARMUP_FONT_SIZES="24,48",
+            BACKGROUND_STORE_DIR=os.path.join(workdir, "store"),
+        )
+
+        app_imports = [float(_run(IMPORT_SNIPPET.format(module="app.main"), env)) for _ in range(runs)]
+        print(f"import app.main:     median {statistics.median(app_imports) * 1000:7.1f} ms")
+        try:
+            weasy_imports = [float(_run(IMPORT_SNIPPET.format(module="weasyprint"), env)) for _ in range(runs)]
+            print(f"import weasyprint:   median {statistics.median(weasy_imports) * 1000:7.1f} ms (deferred to first PDF)")
+        except subprocess.CalledProcessError:
+            print("import weasyprint:   not installed, skipped")
+
+        for warm in (False, True):
+            firsts, seconds = [], []
+            for _ in range(runs):
+                # Start each run with an empty node-wide background store.
+                shutil.rmtree(env["BACKGROUND_STORE_DIR"], ignore_errors=True)
+                first, second = json.loads(_run(FIRST_RENDER_SNIPPET.format(warm=warm), env))
+                firsts.append(first)
+                seconds.append(second)
+            label = "with warm-up" if warm else "cold"
+            print(
+                f"render ({label:12}): first median {statistics.median(firsts) * 1000:7.1f} ms, "
+                f"second median {statistics.median(seconds) * 1000:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.runs)
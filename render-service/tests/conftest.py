@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Mirror the container layout: the service root provides `app`, the repository root `common`.
+SERVICE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path[:0] = [SERVICE_ROOT, os.path.dirname(SERVICE_ROOT)]
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.admission import AdmissionController, estimate_cost
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_estimate_cost_scales_with_pixels_blocks_and_format():
+    assert estimate_cost(1000, 1000, 0, "png") == pytest.approx(1.0)
+    assert estimate_cost(1000, 1000, 2, "png") == pytest.approx(1.1)
+    assert estimate_cost(1000, 1000, 0, "pdf") == pytest.approx(2.5)
+
+
+def test_admits_within_capacity_and_releases():
+    controller = AdmissionController(max_cost=10, max_queue_depth=4, queue_timeout=1)
+
+    async def scenario():
+        async with controller.admit(4):
+            async with controller.admit(6):
+                assert controller._in_flight == 2
+                assert controller._in_flight_cost == pytest.approx(10)
+        assert controller._in_flight == 0
+        assert controller._in_flight_cost == 0
+
+    run(scenario())
+    assert controller.admitted_total == 2
+
+
+def test_waiters_are_admitted_in_fifo_order():
+    controller = AdmissionController(max_cost=10, max_queue_depth=4, queue_timeout=1)
+    order = []
+
+    async def job(name, cost, hold):
+        async with controller.admit(cost):
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def scenario():
+        first = asyncio.ensure_future(job("first", 10, 0.05))
+        await asyncio.sleep(0)
+        # "large" arrives before "small"; small must not overtake it even though it fits sooner.
+        large = asyncio.ensure_future(job("large", 8, 0))
+        await asyncio.sleep(0)
+        small = asyncio.ensure_future(job("small", 1, 0))
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 2
+        await asyncio.gather(first, large, small)
+
+    run(scenario())
+    assert order == ["first", "large", "small"]
+
+
+def test_sheds_with_429_when_queue_is_full():
+    controller = AdmissionController(max_cost=1, max_queue_depth=1, queue_timeout=1)
+
+    async def scenario():
+        await controller.acquire(1)
+        waiter = asyncio.ensure_future(controller.acquire(1))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as raised:
+            await controller.acquire(1)
+        controller.release(1)
+        await waiter
+        controller.release(1)
+        return raised.value
+
+    error = run(scenario())
+    assert error.status_code == 429
+    assert int(error.headers["Retry-After"]) >= 1
+    assert controller.shed_total["queue_full"] == 1
+
+
+def test_sheds_when_queue_deadline_passes():
+    controller = AdmissionController(max_cost=1, max_queue_depth=4, queue_timeout=0.01)
+
+    async def scenario():
+        await controller.acquire(1)
+        with pytest.raises(HTTPException):
+            await controller.acquire(1)
+        assert controller.queue_depth == 0
+        controller.release(1)
+
+    run(scenario())
+    assert controller.shed_total["timeout"] == 1
+    assert controller._in_flight == 0
+
+
+def test_cancelled_waiter_does_not_leak_capacity():
+    controller = AdmissionController(max_cost=1, max_queue_depth=4, queue_timeout=1)
+
+    async def scenario():
+        await controller.acquire(1)
+        waiter = asyncio.ensure_future(controller.acquire(1))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.queue_depth == 0
+        controller.release(1)
+        assert controller._in_flight == 0
+        # Capacity is fully available again.
+        await asyncio.wait_for(controller.acquire(1), timeout=0.1)
+        controller.release(1)
+
+    run(scenario())
+
+
+def test_oversized_request_runs_alone():
+    controller = AdmissionController(max_cost=5, max_queue_depth=4, queue_timeout=1)
+
+    async def scenario():
+        async with controller.admit(50):
+            assert controller._in_flight_cost == pytest.approx(5)
+
+    run(scenario())
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+from PIL import Image
+
+from app.core import assets, preview, render
+from app.core.assets import load_background
+from app.core.preview import PreviewIdleTimeout, PreviewSender, PreviewSession, parse_edits, run_session
+from app.core.render import RenderingCore
+from app.schemas.render import ImageRenderRequest, TemplateServiceResponse
+from common.background_store import SharedBackgroundStore
+from common.text_render import draw_blocks
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class FakeWebSocket:
+    """Records sent messages; every send yields to the loop like a real network write."""
+
+    def __init__(self, incoming=()):
+        self.sent = []
+        self.incoming = asyncio.Queue()
+        for message in incoming:
+            self.incoming.put_nowait(message)
+
+    async def send_json(self, message):
+        await asyncio.sleep(0)
+        self.sent.append(("json", message))
+
+    async def send_bytes(self, data):
+        await asyncio.sleep(0)
+        self.sent.append(("bytes", data))
+
+    async def close(self, code=1000):
+        self.sent.append(("close", code))
+
+    async def receive_text(self):
+        return await self.incoming.get()
+
+
+class FakeSession:
+    blocks = [None, None]
+
+    def __init__(self):
+        self.applied = []
+
+    def apply_and_encode(self, edits):
+        self.applied.append(edits)
+        return {"type": "patch", "revision": len(self.applied)}, b"png"
+
+
+@pytest.fixture
+def core_for(tmp_path, monkeypatch):
+    """Builds a RenderingCore over a generated gradient background with overlapping blocks."""
+    monkeypatch.setattr(render, "STATIC_BACKGROUNDS_PATH", str(tmp_path))
+    monkeypatch.setattr(assets, "background_store", SharedBackgroundStore(str(tmp_path / "store")))
+    background = Image.linear_gradient("L").resize((320, 200)).convert("RGB")
+    background.save(tmp_path / "background.png")
+    template = TemplateServiceResponse(
+        _id=uuid.uuid4(),
+        image_path="/static/backgrounds/background.png",
+        text_blocks=[
+            dict(x=10, y=10, width=200, height=60, font_size=48, color="#FF0000", default_text="Title"),
+            dict(x=30, y=40, width=200, height=60, font_size=36, color="#00FF00", default_text="Overlap"),
+            dict(x=10, y=140, width=200, height=40, font_size=24, color="#0000FF", default_text="Footer"),
+        ],
+    )
+
+    def build(target_width=None):
+        request = ImageRenderRequest(template_id=template.id, text_data=[], target_width=target_width)
+        return RenderingCore(request, template)
+
+    return build
+
+
+@pytest.mark.parametrize("target_width", [None, 160])
+def test_incremental_frame_matches_a_full_redraw(core_for, target_width):
+    core = core_for(target_width)
+    session = PreviewSession(core)
+    path, size = core.background_path(), core.output_size()
+    edits = [{0: "Hello"}, {1: "Overlapping text"}, {0: ""}, {0: "Back", 2: "New footer"}, {1: ""}, {2: "Footer"}]
+    for edit in edits:
+        assert session.apply(edit) is not None
+        expected = draw_blocks(load_background(path, size), core.template.text_blocks, session.texts, session.scale)
+        assert session.frame.tobytes() == expected.tobytes()
+    assert session.revision == len(edits)
+
+
+def test_unchanged_text_is_not_redrawn(core_for):
+    session = PreviewSession(core_for(160))
+    assert session.apply({0: "Title"}) is None
+    assert session.revision == 0
+
+
+def test_large_dirty_regions_fall_back_to_a_full_frame(core_for, monkeypatch):
+    session = PreviewSession(core_for())
+    header, _ = session.encode_update(*session.apply({0: "Hi"}))
+    assert header["type"] == "patch"
+
+    monkeypatch.setattr(preview, "PREVIEW_PATCH_MAX_AREA", 0.01)
+    header, data = session.encode_update(*session.apply({0: "A much longer title"}))
+    assert header["type"] == "frame"
+    assert (header["width"], header["height"]) == session.size
+    assert data[:2] == b"\xff\xd8"  # JPEG
+
+
+def test_parse_edits_accepts_single_and_batched_edits():
+    assert parse_edits({"block": 1, "text": "Hi"}, 2) == {1: "Hi"}
+    assert parse_edits({"blocks": {"0": "a", "1": "b"}}, 2) == {0: "a", 1: "b"}
+    with pytest.raises(ValueError):
+        parse_edits({"block": 2, "text": "x"}, 2)
+
+
+def test_error_replies_never_split_an_update():
+    async def scenario():
+        sender = PreviewSender(FakeWebSocket())
+        await asyncio.gather(
+            sender.send_update(({"type": "patch"}, b"1")),
+            sender.send_json({"type": "error"}),
+            sender.send_update(({"type": "frame"}, b"2")),
+        )
+        return sender.websocket.sent
+
+    sent = run(scenario())
+    for index, (kind, message) in enumerate(sent):
+        if kind == "json" and message["type"] in ("patch", "frame"):
+            assert sent[index + 1][0] == "bytes"
+
+
+def test_edits_are_coalesced_and_errors_reported(monkeypatch):
+    monkeypatch.setattr(preview, "PREVIEW_IDLE_TIMEOUT_SECONDS", 0.2)
+    messages = [json.dumps({"block": 0, "text": text}) for text in ("H", "He", "Hey")] + ["not json"]
+    session = FakeSession()
+
+    async def scenario():
+        sender = PreviewSender(FakeWebSocket(messages))
+        with pytest.raises(PreviewIdleTimeout):
+            await run_session(sender, session)
+        return sender.websocket.sent
+
+    sent = run(scenario())
+    assert session.applied == [{0: "Hey"}]
+    assert [kind for kind, _ in sent] == ["json", "json", "bytes"]
+    assert sent[0][1]["type"] == "error"
+
+
+def test_idle_session_times_out(monkeypatch):
+    monkeypatch.setattr(preview, "PREVIEW_IDLE_TIMEOUT_SECONDS", 0.01)
+
+    async def scenario():
+        await run_session(PreviewSender(FakeWebSocket()), FakeSession())
+
+    with pytest.raises(PreviewIdleTimeout):
+        run(scenario())
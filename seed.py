@@ -1,16 +1,18 @@
 # C:\Users\madhu\web_project\seed.py
 import requests
 import json
-import os
+import tempfile
+import zipfile
 from pathlib import Path
 
 BASE_URL = "http://localhost:8001/api/v1"
-UPLOAD_ENDPOINT = f"{BASE_URL}/templates/upload"
+IMPORT_ENDPOINT = f"{BASE_URL}/templates/import"
 IMAGES_DIR = Path("./seeding_images")
 
 SAMPLE_TEMPLATES = [
     {
         "name": "Professional Template",
+        "tags": ["business", "professional"],
         "image_filename": "image1.jpg",
         "text_blocks": [
             {"x": 50, "y": 50, "width": 800, "height": 100, "font_size": 48, "color": "#FFFFFF", "default_text": "Your Title Here"},
@@ -19,6 +21,7 @@ SAMPLE_TEMPLATES = [
     },
     {
         "name": "Holiday Greeting",
+        "tags": ["holiday", "greeting"],
         "image_filename": "image2.png",
         "text_blocks": [
             {"x": 100, "y": 100, "width": 600, "height": 200, "font_size": 60, "color": "#FFD700", "default_text": "Happy Holidays!"}
@@ -26,6 +29,7 @@ SAMPLE_TEMPLATES = [
     },
     {
         "name": "Rustic Announcement",
+        "tags": ["announcement", "rustic"],
         "image_filename": "image3.jpg",
         "text_blocks": [
             {"x": 50, "y": 50, "width": 400, "height": 50, "font_size": 36, "color": "#000000", "default_text": "Big News"},
@@ -34,37 +38,57 @@ SAMPLE_TEMPLATES = [
     }
 ]
 
+def build_archive(archive_file):
+    """Packs the sample images and a manifest.json into one zip for the bulk import endpoint."""
+    manifest = []
+    # Images are already compressed, so they are stored rather than deflated again.
+    with zipfile.ZipFile(archive_file, "w", compression=zipfile.ZIP_STORED) as archive:
+        for template in SAMPLE_TEMPLATES:
+            image_path = IMAGES_DIR / template["image_filename"]
+            if not image_path.exists():
+                print(f"File not found: {image_path}. Skipping this template.")
+                continue
+            archive.write(image_path, f"images/{image_path.name}")
+            manifest.append({
+                "name": template["name"],
+                "image": f"images/{image_path.name}",
+                "text_blocks": template["text_blocks"],
+                "tags": template["tags"]
+            })
+        archive.writestr("manifest.json", json.dumps(manifest))
+    return len(manifest)
+
 def seed_templates():
     print("Starting template seeding process...")
-    for template in SAMPLE_TEMPLATES:
-        image_path = IMAGES_DIR / template["image_filename"]
-        if not image_path.exists():
-            print(f"File not found: {image_path}. Skipping this template.")
-            continue
+    with tempfile.TemporaryFile() as archive_file:
+        count = build_archive(archive_file)
+        if count == 0:
+            print("Nothing to import.")
+            return
+        archive_file.seek(0)
 
-        data = {
-            "name": template["name"],
-            "text_blocks_json": json.dumps(template["text_blocks"])
-        }
-        
         try:
-            with open(image_path, "rb") as image_file:
-                files = {
-                    "image": (image_path.name, image_file, "image/jpeg" if image_path.suffix.lower() in [".jpg", ".jpeg"] else "image/png")
-                }
-                
-                print(f"Uploading template: '{template['name']}'...")
-                response = requests.post(UPLOAD_ENDPOINT, data=data, files=files, timeout=60)
-                
-                if response.status_code == 201:
-                    print(f"✅ Successfully uploaded '{template['name']}'. ID: {response.json()['_id']}")
-                else:
-                    print(f"❌ Failed to upload '{template['name']}'. Status code: {response.status_code}")
-                    print(f"Server response: {response.text}")
-                    response.raise_for_status()
-
+            print(f"Importing {count} templates...")
+            response = requests.post(
+                IMPORT_ENDPOINT,
+                files={"archive": ("templates.zip", archive_file, "application/zip")},
+                timeout=300
+            )
+            if response.status_code != 200:
+                print(f"❌ Import failed. Status code: {response.status_code}")
+                print(f"Server response: {response.text}")
+                response.raise_for_status()
         except requests.exceptions.RequestException as e:
-            print(f"❌ Failed to upload '{template['name']}'. Error: {e}")
+            print(f"❌ Import failed. Error: {e}")
+            return
+
+    report = response.json()
+    for result in report["results"]:
+        if result["status"] == "created":
+            print(f"✅ Successfully imported '{result['name']}'. ID: {result['id']}")
+        else:
+            print(f"❌ Failed to import '{result['name']}' ({result['status']}): {result['error']}")
+    print(f"Done: {report['created']} created, {report['invalid']} invalid, {report['failed']} failed.")
 
 if __name__ == "__main__":
-    seed_templates()
\ No newline at end of file
+    seed_templates()
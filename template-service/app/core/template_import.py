@@ -0,0 +1,184 @@
+# template-service/app/core/template_import.py
+import asyncio
+import json
+import logging
+import os
+import posixpath
+import zipfile
+from io import BytesIO
+from typing import IO, List, Optional, Tuple
+from uuid import uuid4
+
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageColor
+
+from ..db.template import insert_templates
+from ..schemas.template import TemplateDB, TemplateImportReport, TemplateImportResult, TemplateManifestItem
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+IMPORT_BATCH_SIZE = int(os.getenv("TEMPLATE_IMPORT_BATCH_SIZE", "500"))
+IMPORT_WRITE_CONCURRENCY = int(os.getenv("TEMPLATE_IMPORT_WRITE_CONCURRENCY", "16"))
+IMPORT_MAX_ITEMS = int(os.getenv("TEMPLATE_IMPORT_MAX_ITEMS", "50000"))
+IMAGE_EXTENSIONS = {"JPEG": "jpg", "PNG": "png"}
+
+
+class ImportItemError(Exception):
+    """Raised for a single manifest entry that cannot be imported."""
+
+
+def read_manifest(archive: zipfile.ZipFile) -> list:
+    """Loads the manifest: a JSON array of {name, image, text_blocks, tags} objects."""
+    try:
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+    except KeyError:
+        raise ValueError(f"Archive has no {MANIFEST_NAME}")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{MANIFEST_NAME} is not valid JSON: {e}")
+    if not isinstance(manifest, list):
+        raise ValueError(f"{MANIFEST_NAME} must be a JSON array of templates")
+    if len(manifest) > IMPORT_MAX_ITEMS:
+        raise ValueError(f"Manifest exceeds the maximum of {IMPORT_MAX_ITEMS} templates")
+    return manifest
+
+
+def validate_text_blocks(item: TemplateManifestItem, image_size: Tuple[int, int]):
+    """Checks every block against the image it will be drawn on, not just its field types."""
+    width, height = image_size
+    for number, block in enumerate(item.text_blocks, start=1):
+        if block.width <= 0 or block.height <= 0:
+            raise ImportItemError(f"Text block {number} must have a positive width and height")
+        if block.font_size <= 0:
+            raise ImportItemError(f"Text block {number} must have a positive font size")
+        if block.x < 0 or block.y < 0 or block.x + block.width > width or block.y + block.height > height:
+            raise ImportItemError(f"Text block {number} lies outside the {width}x{height} image")
+        try:
+            ImageColor.getrgb(block.color)
+        except ValueError:
+            raise ImportItemError(f"Text block {number} has an invalid color: {block.color}")
+
+
+def _store_image(archive: zipfile.ZipFile, item: TemplateManifestItem, static_dir: str) -> Tuple[str, Tuple[int, int]]:
+    """
+    Reads, validates and writes one image; runs in a worker thread. Returns the file name
+    and the image size.
+    zipfile serialises reads of the shared archive file, while decompression, decoding
+    and the disk write run in parallel across threads.
+    """
+    member = posixpath.normpath(item.image.lstrip("/"))
+    try:
+        content = archive.read(member)
+    except KeyError:
+        raise ImportItemError(f"Image not found in archive: {item.image}")
+
+    try:
+        with Image.open(BytesIO(content)) as image:  # Parses the header only.
+            image_format, image_size = image.format, image.size
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ImportItemError(f"Unreadable image {item.image}: {e}")
+    if image_format not in IMAGE_EXTENSIONS:
+        raise ImportItemError(f"Invalid image format for {item.image}. Only JPEG and PNG are allowed.")
+    validate_text_blocks(item, image_size)
+
+    filename = f"{uuid4()}.{IMAGE_EXTENSIONS[image_format]}"
+    image_path_on_disk = os.path.join(static_dir, filename)
+    try:
+        with open(image_path_on_disk, "wb") as buffer:
+            buffer.write(content)
+    except Exception:
+        if os.path.exists(image_path_on_disk):
+            os.remove(image_path_on_disk)
+        raise
+    return filename, image_size
+
+
+def _remove_images(static_dir: str, filenames: List[str]):
+    for filename in filenames:
+        try:
+            os.remove(os.path.join(static_dir, filename))
+        except FileNotFoundError:
+            pass
+
+
+async def _import_batch(db, archive: zipfile.ZipFile, batch: List[Tuple[int, dict]], static_dir: str,
+                        results: List[TemplateImportResult], semaphore: asyncio.Semaphore):
+    items: List[Tuple[int, TemplateManifestItem]] = []
+    for index, raw in batch:
+        try:
+            item = TemplateManifestItem(**raw)
+            if not item.name.strip():
+                raise ValueError("Template name must not be empty")
+            items.append((index, item))
+        except (TypeError, ValueError) as e:  # pydantic's ValidationError is a ValueError
+            name = raw.get("name") if isinstance(raw, dict) else None
+            results[index] = TemplateImportResult(index=index, name=name, status="invalid", error=str(e))
+
+    async def store(item: TemplateManifestItem) -> Tuple[str, Tuple[int, int]]:
+        async with semaphore:
+            return await run_in_threadpool(_store_image, archive, item, static_dir)
+
+    stored = await asyncio.gather(*(store(item) for _, item in items), return_exceptions=True)
+
+    templates, positions, filenames = [], [], []
+    for (index, item), outcome in zip(items, stored):
+        if isinstance(outcome, ImportItemError):
+            results[index] = TemplateImportResult(index=index, name=item.name, status="invalid", error=str(outcome))
+            continue
+        if isinstance(outcome, Exception):
+            results[index] = TemplateImportResult(index=index, name=item.name, status="failed", error=f"Failed to save image: {outcome}")
+            continue
+        filename, (width, height) = outcome
+        templates.append(TemplateDB(
+            id=uuid4(),
+            name=item.name,
+            image_path=f"/static/backgrounds/{filename}",
+            text_blocks=item.text_blocks,
+            tags=item.tags,
+            width=width,
+            height=height,
+        ))
+        positions.append(index)
+        filenames.append(filename)
+
+    if not templates:
+        return
+    try:
+        errors = await insert_templates(db, templates)
+    except Exception as e:
+        logger.error(f"Template import: batch insert failed: {e}")
+        errors = {position: f"Failed to save template to database: {e}" for position in range(len(templates))}
+
+    orphaned = []
+    for position, (index, template) in enumerate(zip(positions, templates)):
+        if position in errors:
+            results[index] = TemplateImportResult(index=index, name=template.name, status="failed", error=errors[position])
+            orphaned.append(filenames[position])
+        else:
+            results[index] = TemplateImportResult(index=index, name=template.name, status="created", id=template.id)
+    if orphaned:
+        await run_in_threadpool(_remove_images, static_dir, orphaned)
+
+
+async def import_templates(db, upload: IO[bytes], static_dir: str) -> TemplateImportReport:
+    """
+    Imports a zip archive of images plus a manifest. Items are processed in batches of
+    IMPORT_BATCH_SIZE: images are validated and written concurrently, then the batch is
+    stored with a single unordered insert_many. Every manifest entry gets a result.
+    """
+    try:
+        archive = await run_in_threadpool(zipfile.ZipFile, upload)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Upload is not a valid zip archive: {e}")
+
+    with archive:
+        manifest = await run_in_threadpool(read_manifest, archive)
+        results: List[Optional[TemplateImportResult]] = [None] * len(manifest)
+        semaphore = asyncio.Semaphore(IMPORT_WRITE_CONCURRENCY)
+        entries = list(enumerate(manifest))
+        for start in range(0, len(entries), IMPORT_BATCH_SIZE):
+            await _import_batch(db, archive, entries[start:start + IMPORT_BATCH_SIZE], static_dir, results, semaphore)
+
+    counts = {status: sum(1 for result in results if result.status == status) for status in ("created", "invalid", "failed")}
+    logger.info(f"Template import: {len(results)} items, {counts}")
+    return TemplateImportReport(total=len(results), results=results, **counts)
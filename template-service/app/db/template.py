@@ -1,23 +1,72 @@
 # user-profile-service/app/db/template.py
 from uuid import UUID, uuid4
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import BulkWriteError
 
 from ..schemas.template import TemplateDB, TemplateCreate
 
 TEMPLATES_COLLECTION = "templates"
 
+# Sortable fields and the keys each sort uses, before the final _id tie-breaker. All keys
+# share the requested direction, so one ascending index serves both directions.
+SORT_KEYS = {
+    "created_at": ("created_at",),
+    "name": ("name",),
+    "block_count": ("block_count",),
+    "width": ("width", "height", "created_at"),
+}
+SORT_FIELDS = tuple(SORT_KEYS)
+
+# Every non-text search and sort is served by one of these without an in-memory sort.
+# Index keys ending in _id let the index deliver the tie-broken order as well.
+TEMPLATE_INDEXES = [
+    IndexModel([("name", TEXT), ("tags", TEXT)], name="name_tags_text", weights={"name": 10, "tags": 5}),
+    IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_1__id_1"),
+    IndexModel([("name", ASCENDING), ("_id", ASCENDING)], name="name_1__id_1"),
+    IndexModel([("block_count", ASCENDING), ("_id", ASCENDING)], name="block_count_1__id_1"),
+    # Also serves exact width/height filters sorted by created_at.
+    IndexModel([("width", ASCENDING), ("height", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+               name="width_1_height_1_created_at_1__id_1"),
+    # Tag filters sorted by created_at.
+    IndexModel([("tags", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)], name="tags_1_created_at_1__id_1"),
+]
+
+SEARCH_FIELDS = ("name", "image_path", "tags", "width", "height", "block_count", "created_at", "text_blocks")
+DEFAULT_SEARCH_FIELDS = ("name", "image_path", "tags", "width", "height", "block_count", "created_at")
+
+async def ensure_indexes(db: AsyncIOMotorClient):
+    """Creates the search indexes (a no-op when they exist) and fills in the derived search
+    fields on templates stored before they were recorded."""
+    await db[TEMPLATES_COLLECTION].create_indexes(TEMPLATE_INDEXES)
+    await db[TEMPLATES_COLLECTION].update_many(
+        {"block_count": {"$exists": False}},
+        [{"$set": {"block_count": {"$size": {"$ifNull": ["$text_blocks", []]}}, "tags": {"$ifNull": ["$tags", []]}}}],
+    )
+
+def _to_document(template: TemplateDB) -> dict:
+    document = template.model_dump(by_alias=True)
+    document['_id'] = str(document['_id'])
+    document['block_count'] = len(template.text_blocks)
+    if document['created_at'] is None:
+        document['created_at'] = datetime.now(timezone.utc)
+    return document
+
 async def create_template(db: AsyncIOMotorClient, template: TemplateCreate) -> TemplateDB:
     try:
         template_with_id = TemplateDB(
             id=uuid4(),
             name=template.name,
             image_path=template.image_path,
-            text_blocks=template.text_blocks
+            text_blocks=template.text_blocks,
+            tags=template.tags,
+            width=template.width,
+            height=template.height
         )
         
-        template_dict = template_with_id.model_dump(by_alias=True)
-        template_dict['_id'] = str(template_dict['_id'])
+        template_dict = _to_document(template_with_id)
 
         result = await db[TEMPLATES_COLLECTION].insert_one(template_dict)
         
@@ -34,6 +83,19 @@ async def create_template(db: AsyncIOMotorClient, template: TemplateCreate) -> T
         print(f"Error during create_template: {e}")
         raise RuntimeError(f"Database operation failed: {e}")
 
+async def insert_templates(db: AsyncIOMotorClient, templates: List[TemplateDB]) -> Dict[int, str]:
+    """
+    Inserts a batch with one unordered insert_many, so a bad document does not stop the
+    rest of the batch. Returns the error message for each position that was not inserted.
+    """
+    documents = [_to_document(template) for template in templates]
+
+    try:
+        await db[TEMPLATES_COLLECTION].insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        return {error["index"]: error.get("errmsg", "Insert failed") for error in e.details.get("writeErrors", [])}
+    return {}
+
 async def get_template(db: AsyncIOMotorClient, template_id: UUID) -> Optional[TemplateDB]:
     template = await db[TEMPLATES_COLLECTION].find_one({"_id": str(template_id)})
     if template:
@@ -42,4 +104,89 @@ async def get_template(db: AsyncIOMotorClient, template_id: UUID) -> Optional[Te
 
 async def get_all_templates(db: AsyncIOMotorClient) -> List[TemplateDB]:
     templates = await db[TEMPLATES_COLLECTION].find().to_list(1000)
-    return [TemplateDB(**template) for template in templates]
\ No newline at end of file
+    return [TemplateDB(**template) for template in templates]
+
+def search_sort(sort: str, text: Optional[str] = None) -> List[Tuple[str, object]]:
+    if sort == "relevance":
+        if not text:
+            raise ValueError("Sorting by relevance requires a search query")
+        return [("score", {"$meta": "textScore"})]
+    field = sort.lstrip("-")
+    if field not in SORT_KEYS:
+        raise ValueError(f"Cannot sort by '{sort}'. Choose relevance or one of: {', '.join(SORT_FIELDS)} (prefix - for descending)")
+    # _id breaks ties so page boundaries are stable. Every key follows the requested
+    # direction so the matching index can be walked forwards or backwards.
+    direction = DESCENDING if sort.startswith("-") else ASCENDING
+    return [(key, direction) for key in SORT_KEYS[field] + ("_id",)]
+
+def _range(minimum, maximum) -> Optional[dict]:
+    condition = {}
+    if minimum is not None:
+        condition["$gte"] = minimum
+    if maximum is not None:
+        condition["$lte"] = maximum
+    return condition or None
+
+def search_filter(
+    text: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    min_width: Optional[int] = None,
+    max_width: Optional[int] = None,
+    min_height: Optional[int] = None,
+    max_height: Optional[int] = None,
+    min_blocks: Optional[int] = None,
+    max_blocks: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> dict:
+    query = {}
+    if text:
+        query["$text"] = {"$search": text}
+    if tags:
+        query["tags"] = {"$all": tags}
+    for field, condition in (
+        ("width", _range(min_width, max_width)),
+        ("height", _range(min_height, max_height)),
+        ("block_count", _range(min_blocks, max_blocks)),
+        ("created_at", _range(created_after, created_before)),
+    ):
+        if condition:
+            query[field] = condition
+    return query
+
+async def search_templates(
+    db: AsyncIOMotorClient,
+    sort: str = "-created_at",
+    page: int = 1,
+    page_size: int = 20,
+    fields: Optional[List[str]] = None,
+    include_total: bool = False,
+    **filters,
+) -> Tuple[List[dict], bool, Optional[int]]:
+    """
+    Runs an indexed search and returns (documents, has_more, total). `filters` are the
+    arguments of `search_filter`. Only the requested fields are read; `total` is counted
+    only when asked for, since it costs a second query.
+    """
+    query = search_filter(**filters)
+    text = filters.get("text")
+
+    fields = fields or list(DEFAULT_SEARCH_FIELDS)
+    unknown = [field for field in fields if field not in SEARCH_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(SEARCH_FIELDS)}")
+    projection = {field: 1 for field in fields}
+    if text:
+        projection["score"] = {"$meta": "textScore"}
+
+    # One extra document tells whether another page exists without counting the matches.
+    cursor = (
+        db[TEMPLATES_COLLECTION]
+        .find(query, projection)
+        .sort(search_sort(sort, text))
+        .skip((page - 1) * page_size)
+        .limit(page_size + 1)
+    )
+    documents = await cursor.to_list(page_size + 1)
+    total = await db[TEMPLATES_COLLECTION].count_documents(query) if include_total else None
+    return documents[:page_size], len(documents) > page_size, total
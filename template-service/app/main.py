@@ -4,10 +4,12 @@ from contextlib import asynccontextmanager
 import uvicorn
 import os
 from dotenv import load_dotenv
-from fastapi.staticfiles import StaticFiles
 
 from .db.mongodb import connect_to_mongo, close_mongo_connection, get_database
+from .db.template import ensure_indexes
 from .routers import template as template_router
+from common.auth import JWTAuthMiddleware
+from common.staticfiles import ImmutableStaticFiles
 
 load_dotenv()
 
@@ -15,6 +17,7 @@ load_dotenv()
 async def lifespan(app: FastAPI):
     print("Template Service: Starting up...")
     await connect_to_mongo()
+    await ensure_indexes(get_database())
     yield
     print("Template Service: Shutting down...")
     await close_mongo_connection()
@@ -26,8 +29,16 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Mount static directory for template images
-app.mount("/static", StaticFiles(directory="/app/static"), name="static")
+# Tokens issued by auth-service are verified locally, without a call back to auth-service.
+if os.getenv("AUTH_REQUIRED", "false").lower() == "true":
+    app.add_middleware(
+        JWTAuthMiddleware,
+        exempt_paths=["/", "/health", "/static", "/docs", "/openapi.json"],
+    )
+
+# Mount static directory for template images. Backgrounds are uuid-named and never
+# rewritten, so they are served as immutable with strong ETags and Range support.
+app.mount("/static", ImmutableStaticFiles(directory="/app/static"), name="static")
 
 # Include the template router
 app.include_router(template_router.router, prefix="/api/v1")
@@ -1,18 +1,23 @@
 # user-profile-service/app/routers/template.py
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from typing import List, Annotated
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
+from typing import List, Annotated, Optional
+from datetime import datetime
+from io import BytesIO
+from PIL import Image
+from uuid import UUID
 import os
 from uuid import uuid4
 from motor.motor_asyncio import AsyncIOMotorClient
 from json import loads
 
-from ..schemas.template import TemplateCreate, TemplateDB, TextBlock
+from ..schemas.template import TemplateCreate, TemplateDB, TemplateImportReport, TemplateSearchPage, TextBlock
 from ..db.mongodb import get_database
-from ..db.template import create_template, get_all_templates
+from ..core.template_import import import_templates
+from ..db.template import create_template, get_all_templates, get_template, search_templates
 
 router = APIRouter(prefix="/templates", tags=["Templates"])
 
-STATIC_DIR = "/app/static/backgrounds"
+STATIC_DIR = os.getenv("STATIC_BACKGROUNDS_PATH", "/app/static/backgrounds")
 os.makedirs(STATIC_DIR, exist_ok=True)
 
 def get_db_client():
@@ -28,12 +33,72 @@ async def get_all_templates_endpoint(
     templates = await get_all_templates(db)
     return templates
 
+@router.get("/search", response_model=TemplateSearchPage, response_model_exclude_none=True)
+async def search_templates_endpoint(
+    db: Annotated[AsyncIOMotorClient, Depends(get_db_client)],
+    q: Annotated[Optional[str], Query(max_length=200, description="Text search over name and tags")] = None,
+    tags: Annotated[Optional[List[str]], Query(description="Templates must carry all of these tags")] = None,
+    min_width: Annotated[Optional[int], Query(ge=0)] = None,
+    max_width: Annotated[Optional[int], Query(ge=0)] = None,
+    min_height: Annotated[Optional[int], Query(ge=0)] = None,
+    max_height: Annotated[Optional[int], Query(ge=0)] = None,
+    min_blocks: Annotated[Optional[int], Query(ge=0)] = None,
+    max_blocks: Annotated[Optional[int], Query(ge=0)] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    sort: Annotated[str, Query(description="relevance, or a field name; prefix - for descending")] = "-created_at",
+    page: Annotated[int, Query(ge=1, le=1000)] = 1,
+    page_size: Annotated[int, Query(ge=1, le=100)] = 20,
+    fields: Annotated[Optional[str], Query(description="Comma separated fields to return")] = None,
+    include_total: bool = False,
+):
+    """
+    Searches templates server-side using the collection's indexes, returning one page
+    of results with only the requested fields.
+    """
+    try:
+        documents, has_more, total = await search_templates(
+            db,
+            text=q,
+            tags=[tag.strip().lower() for tag in tags] if tags else None,
+            min_width=min_width,
+            max_width=max_width,
+            min_height=min_height,
+            max_height=max_height,
+            min_blocks=min_blocks,
+            max_blocks=max_blocks,
+            created_after=created_after,
+            created_before=created_before,
+            sort=sort,
+            page=page,
+            page_size=page_size,
+            fields=[field.strip() for field in fields.split(",") if field.strip()] if fields else None,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return TemplateSearchPage(items=documents, page=page, page_size=page_size, has_more=has_more, total=total)
+
+@router.get("/{template_id}", response_model=TemplateDB)
+async def get_template_endpoint(
+    template_id: UUID,
+    db: Annotated[AsyncIOMotorClient, Depends(get_db_client)],
+):
+    """
+    Fetches a single template by its id.
+    """
+    template = await get_template(db, template_id)
+    if template is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template not found")
+    return template
+
 @router.post("/upload", response_model=TemplateDB, status_code=status.HTTP_201_CREATED)
 async def upload_template_endpoint(
     db: Annotated[AsyncIOMotorClient, Depends(get_db_client)],
     name: Annotated[str, Form()],
     text_blocks_json: Annotated[str, Form()],
-    image: Annotated[UploadFile, File()]
+    image: Annotated[UploadFile, File()],
+    tags: Annotated[Optional[str], Form()] = None
 ):
     """
     Accepts an image and template metadata, validates it, and saves it.
@@ -45,6 +110,21 @@ async def upload_template_endpoint(
             detail="Invalid image format. Only JPEG and PNG are allowed."
         )
 
+    file_content = await image.read()
+    try:
+        with Image.open(BytesIO(file_content)) as background:  # Reads the header only.
+            image_format, image_size = background.format, background.size
+    except (OSError, Image.DecompressionBombError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unreadable image: {str(e)}"
+        )
+    if image_format not in ("JPEG", "PNG"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid image format. Only JPEG and PNG are allowed."
+        )
+
     image_path_on_disk = None
 
     try:
@@ -52,7 +132,6 @@ async def upload_template_endpoint(
         unique_filename = f"{uuid4()}.{file_extension}"
         image_path_on_disk = os.path.join(STATIC_DIR, unique_filename)
         
-        file_content = await image.read()
         with open(image_path_on_disk, "wb") as buffer:
             buffer.write(file_content)
         
@@ -79,7 +158,10 @@ async def upload_template_endpoint(
         template_in_db = TemplateCreate(
             name=name,
             image_path=image_path_for_db,
-            text_blocks=text_blocks_data
+            text_blocks=text_blocks_data,
+            tags=tags.split(",") if tags else [],
+            width=image_size[0],
+            height=image_size[1]
         )
         new_template = await create_template(db, template_in_db)
         if not new_template:
@@ -94,4 +176,22 @@ async def upload_template_endpoint(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to save template to database: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post("/import", response_model=TemplateImportReport)
+async def import_templates_endpoint(
+    db: Annotated[AsyncIOMotorClient, Depends(get_db_client)],
+    archive: Annotated[UploadFile, File()]
+):
+    """
+    Bulk-imports templates from a zip archive containing the images and a `manifest.json`
+    array of {name, image, text_blocks, tags} entries. Returns a per-item report; one bad entry
+    never fails the rest of the import.
+    """
+    try:
+        return await import_templates(db, archive.file, STATIC_DIR)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid import archive: {str(e)}"
+        )
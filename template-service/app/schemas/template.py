@@ -1,7 +1,8 @@
 # user-profile-service/app/schemas/template.py
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List
+from pydantic import BaseModel, Field, ConfigDict, field_validator
+from typing import List, Optional
 from uuid import UUID, uuid4
+from datetime import datetime
 
 class TextBlock(BaseModel):
     x: int
@@ -12,10 +13,20 @@ class TextBlock(BaseModel):
     color: str
     default_text: str
 
+def normalize_tags(tags: List[str]) -> List[str]:
+    """Lower-cased, trimmed and de-duplicated, so tag filters can use exact index matches."""
+    return list(dict.fromkeys(tag.strip().lower() for tag in tags if tag.strip()))
+
 class TemplateBase(BaseModel):
     name: str
     image_path: str
     text_blocks: List[TextBlock]
+    tags: List[str] = []
+    # Background dimensions in pixels; missing on templates created before they were recorded.
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+    _normalize_tags = field_validator("tags")(normalize_tags)
 
 class TemplateCreate(TemplateBase):
     pass
@@ -26,4 +37,52 @@ class TemplateDB(TemplateBase):
         json_encoders={UUID: str}
     )
 
-    id: UUID = Field(alias="_id", default_factory=uuid4)
\ No newline at end of file
+    id: UUID = Field(alias="_id", default_factory=uuid4)
+    # Stored alongside the template so searches can filter and sort on indexed fields.
+    block_count: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+class TemplateSearchItem(BaseModel):
+    """A search hit, holding only the projected fields."""
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: UUID = Field(alias="_id")
+    name: Optional[str] = None
+    image_path: Optional[str] = None
+    tags: Optional[List[str]] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    block_count: Optional[int] = None
+    created_at: Optional[datetime] = None
+    text_blocks: Optional[List[TextBlock]] = None
+    score: Optional[float] = None  # Text relevance, only when searching with `q`
+
+class TemplateSearchPage(BaseModel):
+    items: List[TemplateSearchItem]
+    page: int
+    page_size: int
+    has_more: bool
+    total: Optional[int] = None  # Only counted when requested
+
+class TemplateManifestItem(BaseModel):
+    """One entry of a bulk import manifest; `image` is the file's path inside the archive."""
+    name: str
+    image: str
+    text_blocks: List[TextBlock]
+    tags: List[str] = []
+
+    _normalize_tags = field_validator("tags")(normalize_tags)
+
+class TemplateImportResult(BaseModel):
+    index: int
+    name: Optional[str] = None
+    status: str  # "created", "invalid" or "failed"
+    id: Optional[UUID] = None
+    error: Optional[str] = None
+
+class TemplateImportReport(BaseModel):
+    total: int
+    created: int
+    invalid: int
+    failed: int
+    results: List[TemplateImportResult]
@@ -0,0 +1,18 @@
+import os
+
+from PIL import Image
+
+from common.background_store import SharedBackgroundStore
+
+STATIC_BACKGROUNDS_PATH = os.getenv("STATIC_BACKGROUNDS_PATH", "/app/static/backgrounds")
+
+# Same node-wide store as render-service: a background decoded by any process on the
+# node is mapped here zero-copy instead of being decoded again in every worker process.
+background_store = SharedBackgroundStore.from_env()
+
+
+def load_background(image_path: str) -> Image.Image:
+    """Returns a private, drawable copy of a template background (given its /static path)."""
+    path = os.path.join(STATIC_BACKGROUNDS_PATH, os.path.basename(image_path))
+    shared = background_store.get(path)
+    return shared.convert("RGBA" if shared.mode == "RGBA" else "RGB")
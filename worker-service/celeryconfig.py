@@ -1,7 +1,9 @@
+import os
+
 # The broker and backend connection URLs, pointing to your Redis container
 # 'redis' is the service name from your docker-compose.yml file
-broker_url = 'redis://redis:6379/0'
-result_backend = 'redis://redis:6379/0'
+broker_url = os.getenv('CELERY_BROKER_URL', 'redis://redis:6379/0')
+result_backend = os.getenv('CELERY_RESULT_BACKEND', 'redis://redis:6379/0')
 
 # List of modules to import when the Celery worker starts.
 # This is where your task definitions are located.
@@ -10,6 +12,17 @@ imports = ('tasks',)
 # Task routing to define which tasks go to which queue
 task_routes = {
     'tasks.add': {'queue': 'render_queue'},
+    'tasks.render_campaign_chunk': {'queue': 'render_queue'},
+    'tasks.finalize_campaign': {'queue': 'render_queue'},
+    'tasks.cleanup_campaign_outputs': {'queue': 'render_queue'},
+}
+
+# Periodic tasks, run by the worker's embedded beat (celery worker -B)
+beat_schedule = {
+    'cleanup-campaign-outputs': {
+        'task': 'tasks.cleanup_campaign_outputs',
+        'schedule': float(os.getenv('CAMPAIGN_CLEANUP_INTERVAL_SECONDS', '3600')),
+    },
 }
 
 # Define the task queue
@@ -20,5 +33,11 @@ task_queues = {
     }
 }
 
+# Campaign chunks are long-running: take one at a time and only acknowledge once done,
+# so a worker crash re-delivers the chunk instead of losing it.
+worker_prefetch_multiplier = 1
+task_acks_late = True
+task_reject_on_worker_lost = True
+
 # Optional: Configure logging for the worker
 worker_log_format = "[%(asctime)s: %(levelname)s/%(processName)s] %(message)s"
\ No newline at end of file
@@ -0,0 +1,36 @@
+import logging
+import os
+from typing import List, Optional
+
+from PIL import Image
+
+from common.text_render import draw_blocks
+
+logger = logging.getLogger(__name__)
+
+STATIC_OUTPUTS_PATH = os.getenv("STATIC_OUTPUTS_PATH", "/app/static/outputs")
+CAMPAIGNS_OUTPUT_PATH = os.path.join(STATIC_OUTPUTS_PATH, "campaigns")
+# PDF campaigns are assembled from per-row JPEG pages, which embed into the PDF as-is.
+PDF_PAGE_JPEG_QUALITY = int(os.getenv("PDF_PAGE_JPEG_QUALITY", "90"))
+
+
+def campaign_output_dir(campaign_id: str) -> str:
+    return os.path.join(CAMPAIGNS_OUTPUT_PATH, campaign_id)
+
+
+def row_output_path(campaign_id: str, row_index: int, output_format: str) -> str:
+    extension = "jpg" if output_format == "pdf" else "png"
+    return os.path.join(campaign_output_dir(campaign_id), f"{row_index:07d}.{extension}")
+
+
+def render_row(background: Image.Image, text_blocks: List[dict], texts: List[Optional[str]], output_path: str, output_format: str):
+    """Draws one row's texts onto a copy of the (already decoded) background and saves it."""
+    image = draw_blocks(background.copy(), text_blocks, texts, fill_defaults=True)
+
+    # Write to a temp name first so a retried row never leaves a truncated file behind.
+    tmp_path = f"{output_path}.tmp"
+    if output_format == "pdf":
+        image.convert("RGB").save(tmp_path, "JPEG", quality=PDF_PAGE_JPEG_QUALITY)
+    else:
+        image.save(tmp_path, "PNG")
+    os.replace(tmp_path, output_path)
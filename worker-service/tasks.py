@@ -1,6 +1,123 @@
+import logging
+import os
+import shutil
+import time
+
+import redis
+
 from celery_app import app
+from backgrounds import load_background
+from rendering import CAMPAIGNS_OUTPUT_PATH, campaign_output_dir, render_row, row_output_path
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_REDIS_URL = os.getenv("CAMPAIGN_REDIS_URL", os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0"))
+ROW_MAX_ATTEMPTS = int(os.getenv("CAMPAIGN_ROW_MAX_ATTEMPTS", "3"))
+ROW_RETRY_BACKOFF_SECONDS = float(os.getenv("CAMPAIGN_ROW_RETRY_BACKOFF_SECONDS", "0.2"))
+PROGRESS_EVERY_ROWS = int(os.getenv("CAMPAIGN_PROGRESS_EVERY_ROWS", "50"))
+# Must match render-service: campaign keys expire this long after the last write.
+CAMPAIGN_TTL_SECONDS = int(os.getenv("CAMPAIGN_TTL_SECONDS", str(7 * 24 * 3600)))
+
+redis_client = redis.Redis.from_url(CAMPAIGN_REDIS_URL)
+
 
 @app.task
 def add(x, y):
     """Simple task to demonstrate a worker executing a function."""
-    return x + y
\ No newline at end of file
+    return x + y
+
+
+def _report_progress(campaign_id: str, chunk_index: int, rendered: int, failures: dict):
+    # Counts are stored per chunk (HSET, not HINCRBY) so a redelivered or retried chunk
+    # overwrites its own numbers instead of being counted twice.
+    pipe = redis_client.pipeline()
+    pipe.hset(f"campaign:{campaign_id}:progress", mapping={
+        f"rendered:{chunk_index}": rendered,
+        f"failed:{chunk_index}": len(failures),
+    })
+    pipe.expire(f"campaign:{campaign_id}:progress", CAMPAIGN_TTL_SECONDS)
+    if failures:
+        pipe.hset(f"campaign:{campaign_id}:failures", mapping=failures)
+        pipe.expire(f"campaign:{campaign_id}:failures", CAMPAIGN_TTL_SECONDS)
+    pipe.execute()
+
+
+@app.task(
+    name="tasks.render_campaign_chunk",
+    acks_late=True,
+    autoretry_for=(OSError, redis.exceptions.ConnectionError),
+    retry_backoff=True,
+    max_retries=3,
+)
+def render_campaign_chunk(campaign_id: str, chunk_index: int, template: dict, rows: list, output_format: str):
+    """
+    Renders one chunk of a bulk campaign. The background is loaded and the fonts are
+    resolved once for the whole chunk; each row is then only a copy, a few draw calls
+    and an encode. A failing row is retried on its own and, if it keeps failing,
+    recorded without failing the rest of the chunk.
+    """
+    background = load_background(template["image_path"])
+    text_blocks = template["text_blocks"]
+    os.makedirs(campaign_output_dir(campaign_id), exist_ok=True)
+
+    rendered = 0
+    failures = {}
+    for position, (row_index, texts) in enumerate(rows, start=1):
+        output_path = row_output_path(campaign_id, row_index, output_format)
+        for attempt in range(1, ROW_MAX_ATTEMPTS + 1):
+            try:
+                render_row(background, text_blocks, texts, output_path, output_format)
+                rendered += 1
+                break
+            except Exception as e:
+                if attempt == ROW_MAX_ATTEMPTS:
+                    logger.error(f"Campaign {campaign_id}: row {row_index} failed after {attempt} attempts: {e}")
+                    failures[str(row_index)] = str(e)
+                else:
+                    time.sleep(ROW_RETRY_BACKOFF_SECONDS * attempt)
+        if position % PROGRESS_EVERY_ROWS == 0:
+            _report_progress(campaign_id, chunk_index, rendered, failures)
+
+    _report_progress(campaign_id, chunk_index, rendered, failures)
+    return {"chunk": chunk_index, "rendered": rendered, "failed": len(failures)}
+
+
+@app.task(name="tasks.finalize_campaign")
+def finalize_campaign(chunk_results: list, campaign_id: str):
+    """Chord callback: runs once every chunk of the campaign has finished."""
+    rendered = sum(result["rendered"] for result in chunk_results)
+    failed = sum(result["failed"] for result in chunk_results)
+    pipe = redis_client.pipeline()
+    pipe.hset(f"campaign:{campaign_id}", mapping={
+        "status": "complete",
+        "completed_at": time.time(),
+    })
+    # The results stay downloadable for a full TTL after completion; then every key
+    # expires together and cleanup_campaign_outputs removes the rendered rows.
+    for key in (f"campaign:{campaign_id}", f"campaign:{campaign_id}:progress", f"campaign:{campaign_id}:failures"):
+        pipe.expire(key, CAMPAIGN_TTL_SECONDS)
+    pipe.execute()
+    logger.info(f"Campaign {campaign_id} complete: {rendered} rendered, {failed} failed")
+    return {"rendered": rendered, "failed": failed}
+
+
+@app.task(name="tasks.cleanup_campaign_outputs")
+def cleanup_campaign_outputs():
+    """
+    Periodic (celery beat) sweep: deletes the rendered rows of every campaign whose
+    Redis record has expired, since nothing can download them any more.
+    """
+    try:
+        campaign_ids = os.listdir(CAMPAIGNS_OUTPUT_PATH)
+    except FileNotFoundError:
+        return {"removed": 0}
+
+    removed = 0
+    for campaign_id in campaign_ids:
+        if redis_client.exists(f"campaign:{campaign_id}"):
+            continue
+        shutil.rmtree(os.path.join(CAMPAIGNS_OUTPUT_PATH, campaign_id), ignore_errors=True)
+        removed += 1
+    if removed:
+        logger.info(f"Removed the outputs of {removed} expired campaign(s)")
+    return {"removed": removed}